@@ -0,0 +1,91 @@
+"""Cold import time and time to first frame of a `demo.py`-sized app.
+
+Every measurement runs in a fresh interpreter. Run with
+`python -m benchmarks.startup [runs] [--gtk]`; without `--gtk` the first frame
+is composed and laid out on the headless backend.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ["compy.state", "compy.composable", "compy.gtk", "compy.gtk.core", "compy.gtk.modifier"]
+
+
+def _import(module: str) -> None:
+    start = time.perf_counter()
+    __import__(module)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {'gi' in sys.modules}")
+
+
+def _first_frame(backend: str) -> None:
+    start = time.perf_counter()
+    from compy.widget_factory import widget_factory
+    from demo import CounterApp
+
+    widget_factory.use_backend(backend)
+    if backend == "headless":
+        from compy import layout
+
+        layout.layout(CounterApp().compose(), 800, 600)
+        print(f"{time.perf_counter() - start} {'gi' in sys.modules}")
+        return
+
+    from compy.gtk.core import GtkApp
+
+    def on_window(app, window):
+        def on_tick(*_):
+            print(f"{time.perf_counter() - start} {'gi' in sys.modules}")
+            app.quit()
+            return False
+
+        window.add_tick_callback(on_tick)
+
+    with GtkApp("com.example.startup") as app:
+        with app.application_window("Startup") as window:
+            window(CounterApp())
+        app.app.connect("window-added", on_window)
+        app.run([])
+
+
+def _measure(runs: int, *args: str) -> tuple[float, bool] | None:
+    times, loaded = [], False
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", *args], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        elapsed, gi = result.stdout.split()[-2:]
+        times.append(float(elapsed))
+        loaded = gi == "True"
+    return statistics.median(times), loaded
+
+
+def main(runs: int = 5, gtk: bool = False) -> None:
+    print(f"median of {runs} cold runs")
+    for module in MODULES:
+        result = _measure(runs, "--import", module)
+        if result is None:
+            print(f"import {module:<20} failed")
+        else:
+            print(f"import {module:<20} {result[0] * 1000:7.1f} ms  gi loaded: {result[1]}")
+    backend = "gtk" if gtk else "headless"
+    result = _measure(runs, "--first-frame", backend)
+    if result is None:
+        print(f"first frame ({backend}) failed")
+    else:
+        print(f"first frame ({backend}){'':<8} {result[0] * 1000:7.1f} ms  gi loaded: {result[1]}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--import"]:
+        _import(sys.argv[2])
+    elif sys.argv[1:2] == ["--first-frame"]:
+        _first_frame(sys.argv[2])
+    else:
+        args = sys.argv[1:]
+        gtk = "--gtk" in args
+        main(*(int(arg) for arg in args if arg != "--gtk"), gtk=gtk)
@@ -0,0 +1,58 @@
+"""Memory per node and time to build, compose and lay out a large tree on the headless backend.
+
+Run with `python -m benchmarks.tree [nodes]`.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from compy import layout
+from compy.composable import Column, Row, Text
+from compy.headless import HEADLESS_IMPLEMENTATIONS
+from compy.state import MutableState
+from compy.widget_factory import widget_factory
+
+
+def build(rows: int, count: MutableState[int]):
+    return Column()(*(Row()(Text(f"Row {i}"), Text(count)) for i in range(rows)))
+
+
+def main(nodes: int = 100_000) -> None:
+    widget_factory.load_implementations(HEADLESS_IMPLEMENTATIONS)
+    rows = nodes // 3  # a Row and two Texts per row
+    count = MutableState(0)
+
+    gc.collect()
+    start = time.perf_counter()
+    build(rows, count).compose()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    root = build(rows, count)
+    root.compose()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    node = root.compose()
+    start = time.perf_counter()
+    layout.layout(node, 1920, 1080)
+    full_layout = time.perf_counter() - start
+    node.children[0].children[0].set_intrinsic((1, 1))
+    start = time.perf_counter()
+    layout.layout(node, 1920, 1080)
+    relayout = time.perf_counter() - start
+
+    total = rows * 3 + 1
+    print(f"nodes:           {total}")
+    print(f"build + compose: {elapsed:.3f} s")
+    print(f"memory per node: {size / total:.0f} B")
+    print(f"layout:          {full_layout:.3f} s")
+    print(f"relayout:        {relayout:.3f} s after resizing one leaf")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
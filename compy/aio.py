@@ -0,0 +1,57 @@
+import weakref
+from typing import TYPE_CHECKING, Any, AsyncIterable, Awaitable, Callable
+
+from compy.state import MutableState
+
+if TYPE_CHECKING:
+    import asyncio  # Imported by the first task, keeping it out of startup
+
+# Tasks started by event handlers, keyed by the composable or widget instance owning them.
+_tasks: "weakref.WeakKeyDictionary[Any, set[asyncio.Future[Any]]]" = weakref.WeakKeyDictionary()
+
+
+def call_handler(handler: Callable[[], Any], owner: Any = None) -> None:
+    """
+    Call an event handler, scheduling it as a task if it is asynchronous.
+
+    Tasks are tracked per `owner`, usually the widget instance the handler is
+    attached to, so they can be cancelled when it is disposed.
+    """
+    result = handler()
+    if isinstance(result, Awaitable):
+        import asyncio
+
+        _track(asyncio.ensure_future(result), owner)
+
+
+def cancel_tasks(owner: Any) -> None:
+    """Cancel the pending tasks started by handlers of `owner`."""
+    for task in _tasks.pop(owner, ()):
+        task.cancel()
+
+
+def bind_async[T](
+    state: MutableState[T], source: AsyncIterable[T], owner: Any = None
+) -> "asyncio.Future[None]":
+    """
+    Set `state` to every value produced by an async iterator, in a background task.
+
+    The task is cancelled when `owner` (e.g. the composable showing the state)
+    is disposed.
+    """
+
+    import asyncio
+
+    async def pump() -> None:
+        async for value in source:
+            state.set(value)
+
+    return _track(asyncio.ensure_future(pump()), owner)
+
+
+def _track[T](task: "asyncio.Future[T]", owner: Any) -> "asyncio.Future[T]":
+    if owner is not None:
+        tasks = _tasks.setdefault(owner, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    return task
@@ -0,0 +1,598 @@
+"""
+List and dict states changed in place, with incremental derived views.
+
+Every operation emits change records instead of comparing whole values:
+`ListSplice` and `ListMove` for lists, `DictChange` for dicts. Views made
+with `mapped`, `filtered` and `sorted` apply the records of their source, so
+a single-row update costs work proportional to that row, not to the size of
+the collection. `subscribe_changes` delivers the records of each propagation
+to an observer.
+
+`get()` returns an immutable snapshot, copied at most once per change and
+only when read, so regular observers and composables still see a new value
+on every change; the `equal` policy of a collection compares its items. The
+functions given to views must only depend on their arguments: items are not
+re-evaluated when other states change.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from functools import wraps
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Sequence
+
+from compy import debug
+from compy import state as _state
+from compy.equality import Equality, identity, structural
+from compy.state import DerivedState, State, Subscription, batch
+
+# Sorted views replace all their items at once when a propagation changes more
+# items than this, rather than moving each into place.
+_BULK_CHANGES = 64
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+# The old or new value of a `DictChange` for a key that was added or removed.
+MISSING: Any = _Missing()
+
+
+class ListSplice[T](NamedTuple):
+    """`removed` items at `index` replaced by `added`."""
+
+    index: int
+    removed: tuple[T, ...]
+    added: tuple[T, ...]
+
+
+class ListMove(NamedTuple):
+    """The item at `source` moved to `target`, an index in the list without it."""
+
+    source: int
+    target: int
+
+
+class DictChange[K, V](NamedTuple):
+    """The value of `key` changed from `old` to `new`, either of which may be `MISSING`."""
+
+    key: K
+    old: V
+    new: V
+
+
+type ListChange = ListSplice[Any] | ListMove
+
+
+def _mutation[C: Callable[..., Any]](method: C) -> C:
+    """Run an operation on the main thread in a batch, recording it for the waste detector."""
+
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if _state._dispatch is not None and threading.get_ident() != _state._main_thread_id:
+            _state._dispatch(lambda: wrapper(self, *args, **kwargs))
+            return None
+        version = self._version
+        with batch():
+            result = method(self, *args, **kwargs)
+            if self._version != version and debug.active is not None:
+                debug.active.write(self)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+class _ChangeObserver:
+    __slots__ = ("_callback", "_inbox")
+
+    def __init__(self, callback: Callable[[list[Any]], None], initial: list[Any]) -> None:
+        self._callback = callback
+        self._inbox = initial
+
+    def __call__(self, _: Any) -> None:
+        if self._inbox:
+            changes, self._inbox = self._inbox, []
+            self._callback(changes)
+
+
+class _Collection[T]:
+    """Change records and snapshots shared by collection states and views."""
+
+    __slots__ = ()
+
+    _items: Any
+    _listeners: list[Any]
+    _value: Any
+    _version: int
+
+    def get(self) -> T:
+        value = super().get()  # type: ignore[misc]
+        if value is None:
+            value = self._value = self._snapshot()
+        return value
+
+    def subscribe_changes(self, observer: Callable[[list[Any]], None]) -> Subscription:
+        """
+        Call `observer` with the change records of every propagation.
+
+        It is first called with records adding the current items.
+        """
+        change_observer = _ChangeObserver(observer, self._initial_changes())
+        self._listeners.append(change_observer)
+        return self.subscribe(change_observer)  # type: ignore[attr-defined]
+
+    def unsubscribe(self, observer: Callable[[Any], None]) -> None:
+        super().unsubscribe(observer)  # type: ignore[misc]
+        if isinstance(observer, _ChangeObserver):
+            self._listeners.remove(observer)
+
+    def _emit(self, change: Any) -> None:
+        self._value = None
+        for listener in self._listeners:
+            listener._inbox.append(change)
+        self._notify()  # type: ignore[attr-defined]
+
+    def _snapshot(self) -> T:
+        raise NotImplementedError
+
+    def _initial_changes(self) -> list[Any]:
+        raise NotImplementedError
+
+
+class ListState[T](_Collection[Sequence[T]]):
+    """A state holding a list, read as a tuple snapshot."""
+
+    __slots__ = ()
+
+    _items: list[T]
+
+    def mapped[R](self, func: Callable[[T], R], *, lazy: bool = False) -> "ListState[R]":
+        """A view with `func` applied to each item."""
+        return _MappedList(self, func, lazy)
+
+    def filtered(self, predicate: Callable[[T], bool], *, lazy: bool = False) -> "ListState[T]":
+        """A view of the items satisfying `predicate`, in order."""
+        return _FilteredList(self, predicate, lazy)
+
+    def sorted(
+        self,
+        key: Callable[[T], Any] | None = None,
+        *,
+        reverse: bool = False,
+        lazy: bool = False,
+    ) -> "ListState[T]":
+        """A view of the items sorted by `key`; equal keys keep their order of arrival."""
+        return _SortedView(self, key, reverse, lazy)
+
+    def _snapshot(self) -> Sequence[T]:
+        return tuple(self._items)
+
+    def _initial_changes(self) -> list[Any]:
+        return [ListSplice(0, (), tuple(self._items))] if self._items else []
+
+
+class DictState[K, V](_Collection[Mapping[K, V]]):
+    """A state holding a dict, read as a read-only snapshot."""
+
+    __slots__ = ()
+
+    _items: dict[K, V]
+
+    def mapped[R](self, func: Callable[[V], R], *, lazy: bool = False) -> "DictState[K, R]":
+        """A view with `func` applied to each value."""
+        return _MappedDict(self, func, lazy)
+
+    def filtered(
+        self, predicate: Callable[[K, V], bool], *, lazy: bool = False
+    ) -> "DictState[K, V]":
+        """A view of the items for which `predicate(key, value)` is true."""
+        return _FilteredDict(self, predicate, lazy)
+
+    def sorted(
+        self,
+        key: Callable[[V], Any] | None = None,
+        *,
+        reverse: bool = False,
+        lazy: bool = False,
+    ) -> ListState[V]:
+        """A list view of the values sorted by `key`, e.g. the rows of a table."""
+        return _SortedView(self, key, reverse, lazy)
+
+    def _snapshot(self) -> Mapping[K, V]:
+        return MappingProxyType(dict(self._items))
+
+    def _initial_changes(self) -> list[Any]:
+        return [DictChange(key, MISSING, value) for key, value in self._items.items()]
+
+
+class MutableListState[T](ListState[T], State[Sequence[T]]):
+    """
+    A list changed in place by its operations.
+
+    Each operation compares at most the items it replaces, with the `equal`
+    policy, and emits a `ListSplice` or `ListMove`. Called from another thread
+    with a dispatcher set, operations are applied on the main thread in order
+    and return None.
+    """
+
+    __slots__ = ("_item_equal", "_items", "_listeners")
+
+    def __init__(self, items: Iterable[T] = (), *, equal: Equality = structural) -> None:
+        super().__init__(None, equal=identity)  # type: ignore[arg-type]
+        self._items = list(items)
+        self._listeners = []
+        self._item_equal = equal
+
+    @_mutation
+    def splice(self, index: int, count: int, items: Iterable[T] = ()) -> tuple[T, ...]:
+        """Replace `count` items from `index` with `items`, returning the removed items."""
+        return self._splice(index, count, tuple(items))
+
+    @_mutation
+    def append(self, item: T) -> None:
+        self._splice(len(self._items), 0, (item,))
+
+    @_mutation
+    def extend(self, items: Iterable[T]) -> None:
+        self._splice(len(self._items), 0, tuple(items))
+
+    @_mutation
+    def insert(self, index: int, item: T) -> None:
+        self._splice(index, 0, (item,))
+
+    @_mutation
+    def pop(self, index: int = -1) -> T:
+        return self._splice(range(len(self._items))[index], 1, ())[0]
+
+    @_mutation
+    def remove(self, item: T) -> None:
+        """Remove the first item equal to `item`, raising ValueError if there is none."""
+        self._splice(self._items.index(item), 1, ())
+
+    @_mutation
+    def clear(self) -> None:
+        self._splice(0, len(self._items), ())
+
+    @_mutation
+    def set_item(self, index: int, item: T) -> None:
+        index = range(len(self._items))[index]
+        old = self._items[index]
+        if not self._item_equal(old, item):
+            self._items[index] = item
+            self._emit(ListSplice(index, (old,), (item,)))
+
+    @_mutation
+    def move(self, source: int, target: int) -> None:
+        """Move the item at `source` so that it ends up at `target`."""
+        length = len(self._items)
+        source, target = range(length)[source], range(length)[target]
+        if source != target:
+            self._items.insert(target, self._items.pop(source))
+            self._emit(ListMove(source, target))
+
+    @_mutation
+    def set(self, items: Iterable[T]) -> None:
+        """Replace all items, if they differ from the current ones."""
+        items = list(items)
+        if len(items) != len(self._items) or not all(map(self._item_equal, self._items, items)):
+            removed, self._items = tuple(self._items), items
+            self._emit(ListSplice(0, removed, tuple(items)))
+
+    def _splice(self, index: int, count: int, added: tuple[T, ...]) -> tuple[T, ...]:
+        index = slice(index, index).indices(len(self._items))[0]
+        removed = tuple(self._items[index : index + count])
+        if removed or added:
+            self._items[index : index + len(removed)] = added
+            self._emit(ListSplice(index, removed, added))
+        return removed
+
+
+class MutableDictState[K, V](DictState[K, V], State[Mapping[K, V]]):
+    """
+    A dict changed in place by its operations, each emitting a `DictChange` per key.
+
+    Like `MutableListState`, it can be changed from other threads.
+    """
+
+    __slots__ = ("_item_equal", "_items", "_listeners")
+
+    def __init__(
+        self,
+        items: Mapping[K, V] | Iterable[tuple[K, V]] = (),
+        *,
+        equal: Equality = structural,
+    ) -> None:
+        super().__init__(None, equal=identity)  # type: ignore[arg-type]
+        self._items = dict(items)
+        self._listeners = []
+        self._item_equal = equal
+
+    @_mutation
+    def set_item(self, key: K, value: V) -> None:
+        self._put(key, value)
+
+    @_mutation
+    def pop(self, key: K, default: Any = MISSING) -> V:
+        """Remove `key` and return its value, or `default`; raises KeyError without one."""
+        if key not in self._items:
+            if default is MISSING:
+                raise KeyError(key)
+            return default
+        return self._delete(key)
+
+    @_mutation
+    def update(self, items: Mapping[K, V] | Iterable[tuple[K, V]]) -> None:
+        for key, value in dict(items).items():
+            self._put(key, value)
+
+    @_mutation
+    def clear(self) -> None:
+        for key in list(self._items):
+            self._delete(key)
+
+    @_mutation
+    def set(self, items: Mapping[K, V] | Iterable[tuple[K, V]]) -> None:
+        """Replace all items, emitting changes for the keys whose values differ."""
+        items = dict(items)
+        for key in [key for key in self._items if key not in items]:
+            self._delete(key)
+        for key, value in items.items():
+            self._put(key, value)
+
+    def _put(self, key: K, value: V) -> None:
+        old = self._items.get(key, MISSING)
+        if old is MISSING or not self._item_equal(old, value):
+            self._items[key] = value
+            self._emit(DictChange(key, old, value))
+
+    def _delete(self, key: K) -> V:
+        old = self._items.pop(key)
+        self._emit(DictChange(key, old, MISSING))
+        return old
+
+
+class _View[S](DerivedState[Any]):
+    """
+    A collection view updated from the change records of its source.
+
+    The records are queued in `_inbox` while the view is attached; a detached
+    view rebuilds from its source when read after a change.
+    """
+
+    __slots__ = ("_inbox", "_items", "_listeners", "_source")
+
+    def __init__(self, source: S, lazy: bool) -> None:
+        self._source = source
+        self._listeners: list[Any] = []
+        self._inbox: list[Any] = []
+        super().__init__(self._build, (source,), lazy=lazy, equal=identity)  # type: ignore[arg-type]
+
+    def _build(self) -> None:
+        raise NotImplementedError
+
+    def _apply(self, change: Any) -> None:
+        raise NotImplementedError
+
+    def _attach(self) -> None:
+        if not self._attached:
+            super()._attach()
+            self._source._listeners.append(self)  # type: ignore[attr-defined]
+
+    def _detach(self) -> None:
+        super()._detach()
+        if not self._attached and self in self._source._listeners:  # type: ignore[attr-defined]
+            self._source._listeners.remove(self)  # type: ignore[attr-defined]
+            self._inbox.clear()
+
+    def _refresh(self) -> None:
+        if self._is_outdated():
+            self._evaluate()
+            self._value = None
+            self._version += 1
+
+    def _recompute(self) -> None:
+        for change in self._inbox:
+            self._apply(change)
+        self._inbox.clear()
+        self._dependencies[self._source] = self._source._version  # type: ignore[index, attr-defined]
+
+
+def _list_changes(change: Any) -> tuple[tuple[Any, ...], tuple[Any, ...]]:
+    """The values removed and added by a list or dict change record."""
+    if isinstance(change, ListSplice):
+        return change.removed, change.added
+    if isinstance(change, DictChange):
+        return (
+            () if change.old is MISSING else (change.old,),
+            () if change.new is MISSING else (change.new,),
+        )
+    return (), ()  # Moves do not change the contents
+
+
+def _values(source: Any) -> Iterable[Any]:
+    items = source._items
+    return items.values() if isinstance(items, dict) else items
+
+
+class _MappedList[T, R](ListState[R], _View[ListState[T]]):
+    __slots__ = ("_func",)
+
+    def __init__(self, source: ListState[T], func: Callable[[T], R], lazy: bool) -> None:
+        self._func = func
+        super().__init__(source, lazy)
+
+    def _build(self) -> None:
+        self._items = [self._func(item) for item in self._source._items]
+
+    def _apply(self, change: ListChange) -> None:
+        if isinstance(change, ListMove):
+            self._items.insert(change.target, self._items.pop(change.source))
+            self._emit(change)
+            return
+        index, removed = change.index, len(change.removed)
+        old = tuple(self._items[index : index + removed])
+        new = tuple(self._func(item) for item in change.added)
+        self._items[index : index + removed] = new
+        self._emit(ListSplice(index, old, new))
+
+
+class _FilteredList[T](ListState[T], _View[ListState[T]]):
+    __slots__ = ("_mask", "_predicate")
+
+    def __init__(self, source: ListState[T], predicate: Callable[[T], bool], lazy: bool) -> None:
+        self._predicate = predicate
+        super().__init__(source, lazy)
+
+    def _build(self) -> None:
+        # Whether each item of the source is in the view.
+        self._mask = [bool(self._predicate(item)) for item in self._source._items]
+        self._items = [item for item, kept in zip(self._source._items, self._mask) if kept]
+
+    def _apply(self, change: ListChange) -> None:
+        mask = self._mask
+        if isinstance(change, ListMove):
+            source = mask[: change.source].count(True)
+            kept = mask.pop(change.source)
+            mask.insert(change.target, kept)
+            target = mask[: change.target].count(True)
+            if kept and source != target:
+                self._items.insert(target, self._items.pop(source))
+                self._emit(ListMove(source, target))
+            return
+        index, removed = change.index, len(change.removed)
+        start = mask[:index].count(True)
+        old = tuple(
+            item for item, kept in zip(change.removed, mask[index : index + removed]) if kept
+        )
+        added = [bool(self._predicate(item)) for item in change.added]
+        new = tuple(item for item, kept in zip(change.added, added) if kept)
+        mask[index : index + removed] = added
+        if old or new:
+            self._items[start : start + len(old)] = new
+            self._emit(ListSplice(start, old, new))
+
+
+class _Descending:
+    """Sort key ordering the wrapped keys in reverse."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+
+class _SortedView[T](ListState[T], _View[Any]):
+    __slots__ = ("_key", "_keys")
+
+    def __init__(
+        self, source: Any, key: Callable[[T], Any] | None, reverse: bool, lazy: bool
+    ) -> None:
+        key = key or (lambda item: item)
+        self._key = (lambda item: _Descending(key(item))) if reverse else key
+        super().__init__(source, lazy)
+
+    def _build(self) -> None:
+        self._items = sorted(_values(self._source), key=self._key)
+        self._keys = [self._key(item) for item in self._items]
+
+    def _recompute(self) -> None:
+        changed = sum(
+            len(removed) + len(added) for removed, added in map(_list_changes, self._inbox)
+        )
+        if changed <= _BULK_CHANGES:
+            super()._recompute()
+            return
+        self._inbox.clear()
+        old = tuple(self._items)
+        self._build()
+        self._dependencies[self._source] = self._source._version
+        self._emit(ListSplice(0, old, tuple(self._items)))
+
+    def _apply(self, change: Any) -> None:
+        removed, added = _list_changes(change)
+        for item in removed:
+            index = self._find(item)
+            del self._items[index], self._keys[index]
+            self._emit(ListSplice(index, (item,), ()))
+        for item in added:
+            key = self._key(item)
+            index = bisect_right(self._keys, key)
+            self._items.insert(index, item)
+            self._keys.insert(index, key)
+            self._emit(ListSplice(index, (), (item,)))
+
+    def _find(self, item: T) -> int:
+        key, keys, items = self._key(item), self._keys, self._items
+        index = bisect_left(keys, key)
+        while index < len(items) and not key < keys[index]:
+            if items[index] is item:
+                return index
+            index += 1
+        # Not where its key says, e.g. because it was changed in place.
+        for index, candidate in enumerate(items):
+            if candidate is item:
+                return index
+        return items.index(item)
+
+
+class _MappedDict[K, V, R](DictState[K, R], _View[DictState[K, V]]):
+    __slots__ = ("_func",)
+
+    def __init__(self, source: DictState[K, V], func: Callable[[V], R], lazy: bool) -> None:
+        self._func = func
+        super().__init__(source, lazy)
+
+    def _build(self) -> None:
+        self._items = {key: self._func(value) for key, value in self._source._items.items()}
+
+    def _apply(self, change: DictChange[K, V]) -> None:
+        key, new = change.key, change.new
+        old = self._items.get(key, MISSING)
+        if new is MISSING:
+            del self._items[key]
+        else:
+            new = self._items[key] = self._func(new)
+        self._emit(DictChange(key, old, new))
+
+
+class _FilteredDict[K, V](DictState[K, V], _View[DictState[K, V]]):
+    __slots__ = ("_predicate", "_reorder")
+
+    def __init__(
+        self, source: DictState[K, V], predicate: Callable[[K, V], bool], lazy: bool
+    ) -> None:
+        self._predicate = predicate
+        # Whether a key entered the view out of the order of the source.
+        self._reorder = False
+        super().__init__(source, lazy)
+
+    def _build(self) -> None:
+        self._items = {
+            key: value for key, value in self._source._items.items() if self._predicate(key, value)
+        }
+
+    def _recompute(self) -> None:
+        super()._recompute()
+        if self._reorder:
+            self._reorder = False
+            items = self._items
+            self._items = {key: items[key] for key in self._source._items if key in items}
+
+    def _apply(self, change: DictChange[K, V]) -> None:
+        key, new = change.key, change.new
+        old = self._items.get(key, MISSING)
+        if new is not MISSING and self._predicate(key, new):
+            self._items[key] = new
+            if old is MISSING and change.old is not MISSING:
+                self._reorder = True  # Appended, but kept in the middle of the source
+        else:
+            new = MISSING
+            if old is not MISSING:
+                del self._items[key]
+        if old is not MISSING or new is not MISSING:
+            self._emit(DictChange(key, old, new))
@@ -1,55 +1,350 @@
+from bisect import bisect_left
 from functools import wraps
-from typing import Any, Callable, Self, cast
+from types import UnionType
+from typing import (
+    AbstractSet,
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Self,
+    Sequence,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+)
 
+from compy import debug, trace
+from compy.aio import cancel_tasks
+from compy.collections import ListState
+from compy.equality import Equality, structural
 from compy.modifier import ModifierProtocol
-from compy.state import State
-from compy.widget import ButtonWidget, ColumnWidget, RowWidget, TextWidget, Widget
+from compy.scheduler import get_scheduler
+from compy.state import (
+    State,
+    Subscription,
+    auto_derived,
+    capture_reads,
+    reads_changed,
+    replay_reads,
+    untracked,
+)
+from compy.widget import (
+    ButtonWidget,
+    ColumnWidget,
+    LazyColumnWidget,
+    LazyRowWidget,
+    RowWidget,
+    TextWidget,
+    Widget,
+)
 from compy.widget_factory import widget_factory
 
+# Slots of the content function currently being evaluated, for `memo` and `remember`.
+_scope: "_Scope | None" = None
+
+# Code flags of functions taking *args and **kwargs, as defined by `inspect`.
+_CO_VARARGS = 0x04
+_CO_VARKEYWORDS = 0x08
+
 
 class Composable[T]:
+    __slots__ = (
+        "widget",
+        "_props",
+        "content",
+        "key",
+        "_instance",
+        "_children",
+        "_content",
+        "_subscriptions",
+        "_pending_props",
+        "_pending_content",
+        "_parent",
+        "_remembered",
+        "_disposed",
+        "_recompose_scope",
+        "_equal",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         widget: Widget[T],
         props: dict[str, Any],
         content: Callable[[], list["Composable[Any]"]] | None = None,
+        key: Any = None,
+        state_props: AbstractSet[str] | None = None,
+        equal: dict[str, Equality] | None = None,
+        params: AbstractSet[str] | None = None,
     ):
+        """
+        `state_props` names the props that may hold a `State`, out of all the
+        `params` of the component (by default, `state_props` itself). When
+        every prop is one of the `params`, only `state_props` are checked for
+        bindings; otherwise, or with `state_props=None`, every prop is.
+
+        `equal` maps props to the policy deciding whether a new value is a
+        change; props bound to a state use the policy of the state, and all
+        others compare structurally.
+        """
         self.widget = widget
         self._props = props
         self.content = content
+        self.key = key
         self._instance: Any = None
-        self._subscriptions: list[tuple[str, State]] = []
-        self._setup_subscriptions()
+        self._children: list[Composable[Any]] = []
+        self._content: State[list[Composable[Any]]] | None = None
+        self._subscriptions: list[Subscription] = []
+        self._pending_props: dict[str, Any] | None = None
+        self._pending_content: list[Composable[Any]] | None = None
+        self._parent: Composable[Any] | None = None
+        self._remembered: _SlotTable | None = None
+        self._disposed = False
+        self._recompose_scope: _RecomposeScope | None = None
+        self._equal = equal
+        self._setup_subscriptions(state_props, state_props if params is None else params)
 
-    def _setup_subscriptions(self) -> None:
-        for key, value in self._props.items():
+    def _setup_subscriptions(
+        self, state_props: AbstractSet[str] | None, params: AbstractSet[str] | None
+    ) -> None:
+        keys: Collection[str] = self._props.keys()
+        if state_props is not None and keys <= params:  # type: ignore[operator]
+            keys = state_props  # Props outside the params may hold anything
+        bindings: list[tuple[str, State]] = []
+        for key in keys:
+            value = self._props.get(key)
             if isinstance(value, State):
-                resolved_value = value.get()
-                self._props[key] = resolved_value
-                self._subscriptions.append((key, value))
+                with untracked():
+                    self._props[key] = value.get()
+                bindings.append((key, value))
+                if value._equal is not structural and (
+                    self._equal is None or key not in self._equal
+                ):
+                    self._equal = {**(self._equal or {}), key: value._equal}
 
-        for key, state in self._subscriptions:
-            state.subscribe(lambda value, k=key: self.recompose({k: value}))
+        for key, state in bindings:
+            self._subscriptions.append(
+                state.subscribe(lambda value, k=key: self.recompose({k: value}))
+            )
 
     def compose(self) -> T:
+        scope = self._recompose_scope
+        if scope is not None and scope.root is not self:
+            return scope.root.compose()  # Superseded before it was composed
         if self._instance is None:
-            self._instance = self.widget.create()
-            self.widget.update(self._instance, self._props)
-            if self.content:
-                content_instances = [child.compose() for child in self.content()]
-                self.widget.set_content(self._instance, content_instances)
+            if trace.active is None:
+                self._create()
+            else:
+                trace.active.call("compose", type(self.widget).__name__, self._create)
         return self._instance
 
+    def _create(self) -> None:
+        self._instance = self.widget.create()
+        self.widget.update(self._instance, self._props)
+        self._bind_content()
+
+    def _bind_content(self) -> None:
+        """Evaluate the content, re-evaluating it whenever the states it reads change."""
+        if self.content:
+            content = auto_derived(self._evaluate_content)
+            self._subscriptions.append(content.subscribe(self._update_content))
+            self._content = content
+
+    def _evaluate_content(self) -> list["Composable[Any]"]:
+        children, self._remembered = _in_scope(self._remembered, self.content)  # type: ignore[arg-type]
+        return children
+
+    def _update_content(self, children: list["Composable[Any]"]) -> None:
+        scheduler = get_scheduler()
+        if scheduler is None or self._content is None:
+            self._apply_content(children)
+            return
+        if self._pending_content is not None:
+            _dispose_unused(self._pending_content, children, self._children)
+        self._pending_content = children
+        scheduler.schedule(self)
+
+    def adopt(self, previous: "Composable[T]") -> None:
+        """
+        Take over the widget instance and children of a composable being replaced.
+
+        Only the props that differ are applied to the instance, and `previous`
+        is disposed without destroying it.
+        """
+        self._instance, previous._instance = previous._instance, None
+        self._children, previous._children = previous._children, []
+        self._remembered, previous._remembered = previous._remembered, None
+        for child in self._children:
+            child._parent = self
+        changed = _changed_keys(previous._props, self._props, self._equal)
+        if changed:
+            if debug.active is not None:
+                name = type(self.widget).__name__
+                debug.active.props_updated(name, previous._props, self._props, changed)
+            self._update_widget(changed)
+        previous.dispose()
+        self._bind_content()
+
+    def _update_widget(self, changed: set[str]) -> None:
+        if trace.active is None:
+            self.widget.update(self._instance, self._props, changed)
+        else:
+            name = type(self.widget).__name__
+            trace.active.call(
+                "update", name, self.widget.update, self._instance, self._props, changed
+            )
+
+    def _apply_content(self, children: list["Composable[Any]"]) -> None:
+        if trace.active is None:
+            self._reconcile(children)
+        else:
+            trace.active.call("content", type(self.widget).__name__, self._reconcile, children)
+
+    def _reconcile(self, children: list["Composable[Any]"]) -> None:
+        """
+        Reconcile new children against the current ones.
+
+        Children are matched by widget type and `key` (or position when no key
+        is given). Matched children reuse their widget instances, and only the
+        children outside the longest run that kept its relative order are moved.
+        """
+        instance = self._instance
+        children = [_current(child) for child in children]
+        if not self._children:
+            self._children = children
+            self.widget.set_content(instance, [self._mount(child) for child in children])
+            return
+
+        # Children returned again as the same object (e.g. by `memo`) keep their
+        # place whatever their key; the others are matched by key.
+        reused = {id(child) for child in children}
+        kept: dict[int, int] = {}
+        previous: dict[Any, tuple[int, Composable[Any]]] = {}
+        removed: list[Composable[Any]] = []
+        for index, child in enumerate(self._children):
+            if id(child) in reused:
+                kept[id(child)] = index
+            elif previous.setdefault(_child_key(child, index), (index, child))[1] is not child:
+                removed.append(child)
+
+        sources: list[int] = []
+        for index, child in enumerate(children):
+            old_index = kept.get(id(child))
+            if old_index is not None:
+                sources.append(old_index)
+                continue
+            match = previous.pop(_child_key(child, index), None)
+            if match is None:
+                self._mount(child)
+                sources.append(-1)
+                continue
+            old_index, old_child = match
+            child.adopt(old_child)
+            child._parent = self
+            sources.append(old_index)
+        removed.extend(child for _, child in previous.values())
+
+        for child in removed:
+            self.widget.remove_child(instance, child._instance)
+            child.dispose()
+
+        stable = _longest_increasing_subsequence(sources)
+        sibling = None
+        for index, child in enumerate(children):
+            if index not in stable:
+                self.widget.insert_child_after(instance, child._instance, sibling)
+            sibling = child._instance
+        self._children = children
+
+    def _mount(self, child: "Composable[Any]") -> Any:
+        """Compose `child` under this composable, taking it from a previous parent."""
+        parent = child._parent
+        if parent is not None and parent is not self:
+            parent._release(child)
+        child._parent = self
+        return child.compose()
+
+    def _replace_child(self, old: "Composable[Any]", new: "Composable[Any]") -> None:
+        """Put `new` in the place of the child `old`, reusing its widget when possible."""
+        index = next(i for i, child in enumerate(self._children) if child is old)
+        self._children = [*self._children[:index], new, *self._children[index + 1 :]]
+        new._parent = self
+        if type(new.widget) is type(old.widget):
+            new.adopt(old)
+            return
+        sibling = self._children[index - 1]._instance if index > 0 else None
+        self.widget.remove_child(self._instance, old._instance)
+        self.widget.insert_child_after(self._instance, new.compose(), sibling)
+        old.dispose()
+
+    def _release(self, child: "Composable[Any]") -> None:
+        """Detach a child moved to another parent without disposing it."""
+        self._children = [c for c in self._children if c is not child]
+        if self._instance is not None and child._instance is not None:
+            self.widget.remove_child(self._instance, child._instance)
+
+    def dispose(self) -> None:
+        """Release subscriptions, child subtrees, pending tasks and the widget instance."""
+        self._disposed = True
+        scope = self._recompose_scope
+        if scope is not None and scope.root is self:
+            scope.dispose()
+            self._recompose_scope = None
+        cancel_tasks(self)
+        for subscription in self._subscriptions:
+            subscription.dispose()
+        self._subscriptions.clear()
+        for child in self._children:
+            child.dispose()
+        self._children = []
+        self._parent = None
+        self._remembered = None
+        if self._pending_content is not None:
+            _dispose_unused(self._pending_content, [])
+            self._pending_content = None
+        self._pending_props = None
+        if self._instance is not None:
+            self.widget.dispose(self._instance)
+            self._instance = None
+
     def recompose(self, new_props: dict[str, Any]) -> None:
-        updated_props = {**self._props, **new_props}
+        scheduler = get_scheduler()
+        if scheduler is not None and self._instance is not None:
+            if self._pending_props is None:
+                self._pending_props = {}
+            self._pending_props.update(new_props)
+            scheduler.schedule(self)
+            return
+        self._apply_props(new_props)
+
+    def flush(self) -> None:
+        """Apply the prop and content changes queued by the scheduler."""
+        props, self._pending_props = self._pending_props, None
+        children, self._pending_content = self._pending_content, None
+        if self._instance is None:
+            return
+        if props:
+            self._apply_props(props)
+        if children is not None:
+            self._apply_content(children)
 
-        if updated_props == self._props:
+    def _apply_props(self, new_props: dict[str, Any]) -> None:
+        changed = _changed_keys(self._props, new_props, self._equal)
+        if debug.active is not None and self._instance is not None:
+            name = type(self.widget).__name__
+            if not changed:
+                debug.active.record(debug.NOOP_RECOMPOSE, f"{name}({', '.join(new_props)})")
+            else:
+                debug.active.props_updated(name, self._props, new_props, changed)
+        if not changed:
             return
 
-        self._props = updated_props
+        self._props = {**self._props, **new_props}
 
         if self._instance is not None:
-            self.widget.update(self._instance, self._props)
+            self._update_widget(changed)
 
     def __call__(self, *args: "Composable[Any]") -> Self:
         def new_content():
@@ -59,21 +354,343 @@ class Composable[T]:
         return self
 
 
+def _changed_keys(
+    props: dict[str, Any], new_props: dict[str, Any], equal: dict[str, Equality] | None
+) -> set[str]:
+    if equal is None:
+        return {
+            key
+            for key, value in new_props.items()
+            if key not in props or not structural(props[key], value)
+        }
+    return {
+        key
+        for key, value in new_props.items()
+        if key not in props or not equal.get(key, structural)(props[key], value)
+    }
+
+
+def _dispose_unused(children: list[Composable[Any]], *keep: list[Composable[Any]]) -> None:
+    """Dispose children that were evaluated but superseded before being reconciled."""
+    kept = {id(child) for group in keep for child in group}
+    for child in children:
+        if id(child) not in kept:
+            child.dispose()
+
+
+def _current(child: Composable[Any]) -> Composable[Any]:
+    """The composable to mount for `child`, following recomposition before it was composed."""
+    scope = child._recompose_scope
+    return scope.root if scope is not None and child._instance is None else child
+
+
+def _child_key(child: Composable[Any], index: int) -> tuple[type, Any]:
+    return (type(child.widget), index if child.key is None else child.key)
+
+
+def _longest_increasing_subsequence(sources: list[int]) -> set[int]:
+    """Positions of a longest increasing run of old indices, ignoring new entries (-1)."""
+    tails: list[int] = []  # tails[k]: position ending the best run of length k + 1
+    tail_sources: list[int] = []
+    parents: list[int] = [-1] * len(sources)
+    for position, source in enumerate(sources):
+        if source < 0:
+            continue
+        length = bisect_left(tail_sources, source)
+        if length > 0:
+            parents[position] = tails[length - 1]
+        if length == len(tails):
+            tails.append(position)
+            tail_sources.append(source)
+        else:
+            tails[length] = position
+            tail_sources[length] = source
+
+    stable: set[int] = set()
+    position = tails[-1] if tails else -1
+    while position >= 0:
+        stable.add(position)
+        position = parents[position]
+    return stable
+
+
+class _Slot:
+    __slots__ = ("tag", "inputs", "reads", "value", "table")
+
+    def __init__(
+        self,
+        tag: Any,
+        inputs: Any,
+        reads: dict[State[Any], int],
+        value: Any,
+        table: "_SlotTable | None",
+    ):
+        self.tag = tag
+        self.inputs = inputs
+        self.reads = reads
+        self.value = value
+        self.table = table
+
+    def reusable(self, tag: Any, inputs: Any) -> bool:
+        value = self.value
+        if isinstance(value, Composable) and value._disposed:
+            return False
+        return self.tag is tag and self.inputs == inputs and not reads_changed(self.reads)
+
+
+class _SlotTable:
+    """Values remembered by one evaluation of a content function."""
+
+    __slots__ = ("positional", "keyed")
+
+    def __init__(self) -> None:
+        self.positional: list[_Slot] = []
+        self.keyed: dict[tuple[Any, Any], _Slot] = {}
+
+
+class _Scope:
+    """Evaluation in progress, looking up slots in the table of the previous one."""
+
+    __slots__ = ("previous", "table")
+
+    def __init__(self, previous: _SlotTable | None):
+        self.previous = previous
+        self.table: _SlotTable | None = None
+
+    def find(self, tag: Any, key: Any) -> _Slot | None:
+        previous = self.previous
+        if previous is None:
+            return None
+        if key is not None:
+            return previous.keyed.get((tag, key))
+        index = len(self.table.positional) if self.table is not None else 0
+        return previous.positional[index] if index < len(previous.positional) else None
+
+    def store(self, slot: _Slot, key: Any) -> None:
+        if self.table is None:
+            self.table = _SlotTable()
+        if key is None:
+            self.table.positional.append(slot)
+        else:
+            self.table.keyed[(slot.tag, key)] = slot
+
+
+def _in_scope[V](
+    previous: _SlotTable | None, compute: Callable[[], V]
+) -> tuple[V, _SlotTable | None]:
+    """Run `compute` with its own slots, returning its result and the slots it filled."""
+    global _scope
+    enclosing = _scope
+    _scope = _Scope(previous)
+    try:
+        return compute(), _scope.table
+    finally:
+        _scope = enclosing
+
+
+def _remember[V](tag: Any, inputs: Any, key: Any, compute: Callable[[], V]) -> V:
+    scope = _scope
+    if scope is None:
+        return compute()
+    slot = scope.find(tag, key)
+    if slot is None or not slot.reusable(tag, inputs):
+        previous = slot.table if slot is not None else None
+        (value, table), reads = capture_reads(lambda: _in_scope(previous, compute))
+        slot = _Slot(tag, inputs, reads, value, table)
+    else:
+        replay_reads(slot.reads)
+    scope.store(slot, key)
+    return slot.value
+
+
+def remember[V](compute: Callable[[], V], *keys: Any) -> V:
+    """
+    Return the value `compute` returned at this position of the enclosing content.
+
+    `compute` runs again when `keys` differ from the previous evaluation or a
+    state it read has changed. Outside of a content function it always runs.
+    """
+    return _remember(remember, keys, None, compute)
+
+
+def memo[**P](func: Callable[P, Composable]) -> Callable[P, Composable]:
+    """
+    Reuse the composable a component returned at the same position when called
+    again with equal arguments, keeping its widgets and children.
+
+    Positions are counted per content function; pass `key=` to match a call by
+    key instead, e.g. for items that move in a list. The key is given to the
+    returned composable, and passed on to `func` only if it takes a `key`
+    parameter. Arguments are compared with `==`, so callbacks should not be
+    new lambdas on every call.
+    """
+    code = func.__code__
+    accepts_key = (
+        bool(code.co_flags & _CO_VARKEYWORDS)
+        or "key" in code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+    )
+
+    def call(args: Any, kwargs: dict[str, Any], key: Any) -> Composable:
+        if accepts_key and key is not None:
+            composable = func(*args, **kwargs, key=key)
+        else:
+            composable = func(*args, **kwargs)
+        if composable.key is None:
+            composable.key = key  # Matched by key when the enclosing content reconciles
+        return composable
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> Composable:
+        key = kwargs.pop("key", None)
+        return _remember(func, (args, kwargs), key, lambda: call(args, kwargs, key))
+
+    return wrapper
+
+
+class _RecomposeScope:
+    """
+    Invocation of a `recomposable` function, re-invoked when a state it read changes.
+
+    The composable it returned (the root) is replaced by the new output, which
+    adopts the root's widget if it has the same widget type.
+    """
+
+    __slots__ = ("root", "_remembered", "_output", "_subscription", "_pending")
+
+    def __init__(self, invoke: Callable[[], Composable], name: str):
+        self._remembered: _SlotTable | None = None
+
+        def evaluate() -> Composable:
+            if trace.active is None:
+                root, self._remembered = _in_scope(self._remembered, invoke)
+            else:
+                root, self._remembered = trace.active.call(
+                    "recompose", name, _in_scope, self._remembered, invoke
+                )
+            return root
+
+        # The output tracks its own reads, so they never reach the enclosing content.
+        self._output = trace.name(auto_derived(evaluate), name)
+        with untracked():
+            self.root: Composable = self._output.get()
+        self.root._recompose_scope = self
+        self._pending: Composable | None = None
+        self._subscription = self._output.subscribe(self._update)
+
+    def _update(self, root: Composable) -> None:
+        if root is self.root:
+            return
+        scheduler = get_scheduler()
+        if scheduler is None or self.root._instance is None:
+            self._replace(root)
+            return
+        if self._pending is not None:
+            self._pending.dispose()
+        self._pending = root
+        scheduler.schedule(self)
+
+    def flush(self) -> None:
+        root, self._pending = self._pending, None
+        if root is not None:
+            self._replace(root)
+
+    def _replace(self, root: Composable) -> None:
+        old, self.root = self.root, root
+        root._recompose_scope = self
+        if old._instance is None:
+            # Not composed yet: whoever holds `old` gets the new root when composing it.
+            old.dispose()
+            return
+        old._recompose_scope = None
+        parent = old._parent
+        if parent is not None:
+            parent._replace_child(old, root)
+        elif type(root.widget) is type(old.widget):
+            root.adopt(old)
+        else:
+            raise ValueError("A root composable cannot change its widget type")
+
+    def dispose(self) -> None:
+        self._subscription.dispose()
+        if self._pending is not None:
+            self._pending.dispose()
+            self._pending = None
+
+
+def recomposable[**P](func: Callable[P, Composable]) -> Callable[P, Composable]:
+    """
+    Make a composable function its own recomposition scope.
+
+    The states the function reads while it runs are tracked separately from
+    the enclosing content. When one of them changes, only this function is
+    invoked again and its output reconciled against the existing widgets.
+    """
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> Composable:
+        return _RecomposeScope(lambda: func(*args, **kwargs), func.__qualname__).root
+
+    return wrapper
+
+
+def _signature_props(
+    func: Callable[..., Any],
+) -> tuple[frozenset[str], frozenset[str]] | None:
+    """
+    Names of the parameters of `func`, and of those that may receive a `State`,
+    or None if unknown.
+
+    Read from the code object, as importing `inspect` would slow down startup.
+    """
+    code = func.__code__
+    if code.co_flags & (_CO_VARARGS | _CO_VARKEYWORDS):
+        return None
+    annotations = func.__annotations__
+    params = code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+    state_props = frozenset(
+        name for name in params if name not in annotations or _admits_state(annotations[name])
+    )
+    return frozenset(params), state_props
+
+
+def _admits_state(annotation: Any) -> bool:
+    origin = get_origin(annotation)
+    if origin is Union or origin is UnionType:
+        return any(_admits_state(arg) for arg in get_args(annotation))
+    cls = origin or annotation
+    if isinstance(cls, type):
+        return cls is object or issubclass(cls, State)
+    return True  # Any, type variables and unresolved forward references
+
+
 def composes[**P](
     widget_class: type,
+    *,
+    equal: dict[str, Equality] | None = None,
 ) -> Callable[[Callable[P, dict[str, Any]]], Callable[P, Composable]]:
-    """Convert a function into a composable component of a given widget class."""
+    """
+    Convert a function into a composable component of a given widget class.
+
+    The parameters are inspected once: only those annotated to accept a `State`
+    (or left unannotated) are bound to state changes, unless the function
+    returns props under other keys, which are all checked. `equal` gives props an
+    equality policy other than the structural default, e.g. `identity` for
+    large arrays.
+    """
 
     def decorator(func: Callable[P, dict[str, Any]]) -> Callable[P, Composable]:
+        params, state_props = _signature_props(func) or (None, None)
+
         @wraps(func)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> Composable:
-            content_func = cast(
-                Callable[[], list[Composable[Any]]] | None, kwargs.pop("content", None)
-            )
+            content_func = kwargs.pop("content", None)
+            key = kwargs.pop("key", None)
             props = func(*args, **kwargs)
 
             widget = widget_factory.create(widget_class)
-            return Composable(widget, props, content_func)
+            return Composable(  # type: ignore[arg-type]
+                widget, props, content_func, key, state_props, equal, params
+            )
 
         return cast(Callable[P, Composable], wrapper)
 
@@ -97,6 +714,41 @@ def Column(*, modifier: ModifierProtocol | None = None) -> dict[str, Any]:
 
 @composes(ButtonWidget)
 def Button(
-    onclick: Callable[[], None], *, modifier: ModifierProtocol | None = None
+    onclick: Callable[[], Awaitable[None] | None], *, modifier: ModifierProtocol | None = None
 ) -> dict[str, Any]:
     return locals()
+
+
+def _lazy_list_props(
+    items: Sequence[Any] | State[Sequence[Any]],
+    item: Callable[[Any], Composable],
+    modifier: ModifierProtocol | None,
+) -> dict[str, Any]:
+    """
+    Props of a lazy list; `changes` subscribes to the change records of a list
+    state, so the backend can update its rows without a full reset.
+    """
+    changes = items.subscribe_changes if isinstance(items, ListState) else None
+    return {"items": items, "item": item, "modifier": modifier, "changes": changes}
+
+
+@composes(LazyColumnWidget)
+def LazyColumn(
+    items: Sequence[Any] | State[Sequence[Any]],
+    item: Callable[[Any], Composable],
+    *,
+    modifier: ModifierProtocol | None = None,
+) -> dict[str, Any]:
+    """A vertical list composing `item(value)` only for the rows currently visible."""
+    return _lazy_list_props(items, item, modifier)
+
+
+@composes(LazyRowWidget)
+def LazyRow(
+    items: Sequence[Any] | State[Sequence[Any]],
+    item: Callable[[Any], Composable],
+    *,
+    modifier: ModifierProtocol | None = None,
+) -> dict[str, Any]:
+    """A horizontal list composing `item(value)` only for the items currently visible."""
+    return _lazy_list_props(items, item, modifier)
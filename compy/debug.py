@@ -0,0 +1,106 @@
+"""
+Development-time detection of updates that change nothing.
+
+Flags props that render the same text, recomposes and derived recomputations
+with no effect, and handlers recreated from the same code, and reports them
+against the state writes that caused them.
+"""
+
+import atexit
+import sys
+from collections import Counter
+from typing import IO, Any
+
+from compy import trace
+
+# Set by `enable_waste_detection`.
+active: "WasteDetector | None" = None
+
+EQUAL_RENDER = "equal render"
+NOOP_RECOMPOSE = "no-op recompose"
+EQUIVALENT_HANDLER = "equivalent handler"
+UNCHANGED_DERIVED = "unchanged derived"
+
+
+class WasteDetector:
+    """
+    Counts wasted updates per kind, component or state, and source of the write.
+
+    - equal render: a prop changed to a value that compares unequal but has
+      the same text, e.g. `1` and `1.0` or two equal-looking objects
+    - no-op recompose: a recompose that changed no prop
+    - equivalent handler: a callback prop replaced by a function with the same
+      code, like a lambda recreated on every render
+    - unchanged derived: a derived state recomputed to an equal value
+
+    Each is attributed to the `MutableState.set` calls that started the
+    propagation, or to "composition" when there were none.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[tuple[str, str, str]] = Counter()
+        self._sources: dict[str, None] = {}
+        self._settled = True
+
+    def write(self, state: Any) -> None:
+        """Record a state write as the source of the updates that follow."""
+        if self._settled:
+            self._sources.clear()
+            self._settled = False
+        caller = sys._getframe(2)  # The code calling MutableState.set
+        location = f"{caller.f_code.co_filename}:{caller.f_lineno}"
+        self._sources[f"{trace.label(state)} at {location}"] = None
+
+    def settle(self) -> None:
+        """End the propagation; the next write starts a new set of sources."""
+        self._settled = True
+
+    def record(self, kind: str, target: str) -> None:
+        source = ", ".join(self._sources) if self._sources else "composition"
+        self.counts[kind, target, source] += 1
+
+    def props_updated(
+        self, component: str, old: dict[str, Any], new: dict[str, Any], changed: set[str]
+    ) -> None:
+        for key in changed:
+            if key not in old:
+                continue
+            before, after = old[key], new[key]
+            code = getattr(before, "__code__", None)
+            if code is not None and code is getattr(after, "__code__", None):
+                self.record(EQUIVALENT_HANDLER, f"{component}.{key}")
+            elif not callable(after) and str(before) == str(after):
+                self.record(EQUAL_RENDER, f"{component}.{key}")
+
+    def report(self, count: int = 20) -> str:
+        """The most frequent wasted updates, one per line."""
+        if not self.counts:
+            return "No wasted updates"
+        lines = ["Wasted updates:"]
+        lines.extend(
+            f"{total:8}  {kind:<19} {target}  <- {source}"
+            for (kind, target, source), total in self.counts.most_common(count)
+        )
+        return "\n".join(lines)
+
+    def print_report(self, file: IO[str] | None = None) -> None:
+        print(self.report(), file=file or sys.stderr)
+
+    def reset(self) -> None:
+        self.counts.clear()
+
+
+def enable_waste_detection(*, report_at_exit: bool = True) -> WasteDetector:
+    """Install a `WasteDetector`, printing its report to stderr at exit by default."""
+    global active
+    active = WasteDetector()
+    if report_at_exit:
+        atexit.register(active.print_report)
+    return active
+
+
+def disable_waste_detection() -> None:
+    global active
+    if active is not None:
+        atexit.unregister(active.print_report)
+    active = None
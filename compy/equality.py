@@ -0,0 +1,57 @@
+"""
+Equality policies deciding whether a new value of a state or prop is a change.
+
+A policy is a function `(old, new) -> bool` returning True when `new` should
+be treated as equal to `old`, so that nothing is notified or updated.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable
+
+type Equality = Callable[[Any, Any], bool]
+
+
+def structural(old: Any, new: Any) -> bool:
+    """
+    Equal by `==`; the default.
+
+    Identical objects are equal without comparing them, and arrays (anything
+    whose `==` returns an elementwise result with `all()`, like NumPy arrays)
+    are equal when their shapes and all their elements are.
+    """
+    if old is new:
+        return True
+    try:
+        result = old == new
+    except ValueError:  # Arrays whose shapes cannot be compared elementwise
+        return False
+    if type(result) is bool:
+        return result
+    all_equal = getattr(result, "all", None)
+    if all_equal is None:
+        return bool(result)
+    return getattr(old, "shape", None) == getattr(new, "shape", None) and bool(all_equal())
+
+
+def identity(old: Any, new: Any) -> bool:
+    """Equal only when the same object: cheap for large values replaced as a whole."""
+    return old is new
+
+
+def never_equal(old: Any, new: Any) -> bool:
+    """Never equal: every write notifies, e.g. for values mutated in place."""
+    return False
+
+
+def versioned(version: Callable[[Any], Any] = attrgetter("version")) -> Equality:
+    """
+    Equal when the values have the same version, read with `version`.
+
+    For values replaced by new objects carrying a revision counter, so their
+    contents never have to be compared.
+    """
+
+    def equal(old: Any, new: Any) -> bool:
+        return old is new or (type(old) is type(new) and version(old) == version(new))
+
+    return equal
@@ -1,16 +1,52 @@
-from compy.gtk.widget import (
-    GtkBoxWidget,
-    GtkButtonWidget,
-    GtkColumnWidget,
-    GtkRowWidget,
-    GtkTextWidget,
-)
-from compy.widget import BoxWidget, ButtonWidget, ColumnWidget, RowWidget, TextWidget, Widget
-
-GTK_IMPLEMENTATIONS: dict[type[Widget], type[Widget]] = {
-    TextWidget: GtkTextWidget,
-    ButtonWidget: GtkButtonWidget,
-    BoxWidget: GtkBoxWidget,
-    RowWidget: GtkRowWidget,
-    ColumnWidget: GtkColumnWidget,
-}
+"""
+GTK 4 backend.
+
+The widget implementations, and with them GTK itself, are only imported when
+`GTK_IMPLEMENTATIONS` is first read, usually by `widget_factory.use_backend("gtk")`
+creating the first widget.
+"""
+
+from typing import Any
+
+from compy.widget import Widget
+
+
+def _implementations() -> dict[type[Widget], type[Widget]]:
+    from compy.gtk.widget import (
+        GtkBoxWidget,
+        GtkButtonWidget,
+        GtkColumnWidget,
+        GtkLazyColumnWidget,
+        GtkLazyRowWidget,
+        GtkRowWidget,
+        GtkTextWidget,
+    )
+    from compy.widget import (
+        BoxWidget,
+        ButtonWidget,
+        ColumnWidget,
+        LazyColumnWidget,
+        LazyRowWidget,
+        RowWidget,
+        TextWidget,
+    )
+
+    return {
+        TextWidget: GtkTextWidget,
+        ButtonWidget: GtkButtonWidget,
+        BoxWidget: GtkBoxWidget,
+        RowWidget: GtkRowWidget,
+        ColumnWidget: GtkColumnWidget,
+        LazyColumnWidget: GtkLazyColumnWidget,
+        LazyRowWidget: GtkLazyRowWidget,
+    }
+
+
+def __getattr__(name: str) -> Any:
+    if name == "GTK_IMPLEMENTATIONS":
+        implementations = globals()[name] = _implementations()
+        return implementations
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["GTK_IMPLEMENTATIONS"]
@@ -0,0 +1,124 @@
+"""asyncio event loop running on the GLib main context"""
+
+import math
+from typing import TYPE_CHECKING, Any
+
+from compy.gtk.typelib import GLib
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+def install_event_loop() -> "asyncio.AbstractEventLoop":
+    """
+    Install an asyncio event loop driven by the GLib main loop.
+
+    Uses the native integration of PyGObject 3.50+, where `Gtk.Application.run`
+    runs the loop. Older versions get a selector loop stepped from GLib
+    sources, only when it has ready callbacks, due timers or I/O.
+    """
+    import asyncio
+
+    try:
+        from gi.events import GLibEventLoopPolicy  # type: ignore
+    except ImportError:
+        loop = _glib_driven_loop()
+        asyncio.set_event_loop(loop)
+        return loop
+
+    policy = GLibEventLoopPolicy()
+    asyncio.set_event_loop_policy(policy)
+    return policy.get_event_loop()
+
+
+def _glib_driven_loop() -> "asyncio.AbstractEventLoop":
+    import asyncio
+
+    class GLibDrivenLoop(asyncio.SelectorEventLoop):
+        """
+        Selector loop whose iterations are run by the GLib main loop
+
+        The selector is watched as a file descriptor, so I/O and wakeups from
+        other threads step the loop. Callbacks and timers scheduled from the
+        main thread add a single GLib source for the earliest of them; an idle
+        loop has no source besides the watch, so it never polls.
+        """
+
+        def __init__(self) -> None:
+            super().__init__()
+            self._stepping = False
+            self._step_source: int | None = None
+            self._step_at = math.inf
+            self._watch = GLib.unix_fd_add_full(
+                GLib.PRIORITY_DEFAULT, self._selector.fileno(), GLib.IOCondition.IN, self._on_io
+            )
+
+        def call_soon(self, callback: Any, *args: Any, context: Any = None) -> Any:
+            handle = super().call_soon(callback, *args, context=context)
+            self._schedule_step()
+            return handle
+
+        def call_at(self, when: float, callback: Any, *args: Any, context: Any = None) -> Any:
+            handle = super().call_at(when, callback, *args, context=context)
+            self._schedule_step()
+            return handle
+
+        def close(self) -> None:
+            self._cancel_step()
+            if self._watch is not None:
+                GLib.source_remove(self._watch)
+                self._watch = None
+            super().close()
+
+        def _schedule_step(self) -> None:
+            """Make sure a GLib source runs the next step by the time work is due."""
+            if self._stepping or self.is_running() or self.is_closed():
+                return  # Rescheduled when the running step ends
+            if self._ready:
+                at = 0.0
+            elif self._scheduled:
+                at = self._scheduled[0].when()
+            else:
+                return
+            if at >= self._step_at:
+                return
+            self._cancel_step()
+            self._step_at = at
+            delay = at - self.time()
+            if delay <= 0:
+                self._step_source = GLib.idle_add(self._on_step)
+            else:
+                self._step_source = GLib.timeout_add(math.ceil(delay * 1000), self._on_step)
+
+        def _cancel_step(self) -> None:
+            if self._step_source is not None:
+                GLib.source_remove(self._step_source)
+                self._step_source = None
+            self._step_at = math.inf
+
+        def _on_step(self) -> bool:
+            self._step_source = None
+            self._step_at = math.inf
+            self._step()
+            return GLib.SOURCE_REMOVE
+
+        def _on_io(self, *_: Any) -> bool:
+            if self.is_closed():
+                self._watch = None
+                return GLib.SOURCE_REMOVE
+            self._step()
+            return GLib.SOURCE_CONTINUE
+
+        def _step(self) -> None:
+            """Run one iteration: ready I/O, due timers and ready callbacks."""
+            if self.is_closed() or self.is_running():
+                return
+            self._stepping = True
+            try:
+                super().call_soon(self.stop)
+                self.run_forever()
+            finally:
+                self._stepping = False
+            self._schedule_step()
+
+    return GLibDrivenLoop()
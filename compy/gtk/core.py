@@ -1,14 +1,19 @@
-import gi
-
 from compy.composable import Composable
-
-gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk  # type: ignore
+from compy.gtk.aio import install_event_loop
+from compy.gtk.scheduler import FrameClockScheduler
+from compy.gtk.typelib import GLib, Gtk
+from compy.scheduler import get_scheduler, set_scheduler
+from compy.state import set_dispatcher
 
 
 class GtkApp:
-    def __init__(self, app_id: str = "com.example.app"):
+    def __init__(self, app_id: str = "com.example.app", frame_aligned: bool = False):
+        """
+        With `frame_aligned`, state changes mark composables dirty and their
+        widgets are updated at most once per frame, from the window's frame clock.
+        """
         self.app = Gtk.Application(application_id=app_id)
+        self.frame_aligned = frame_aligned
         self.windows = []
 
     def __enter__(self):
@@ -18,21 +23,31 @@ class GtkApp:
         pass
 
     def application_window(self, title: str = "Untitled") -> "ApplicationWindow":
-        window = ApplicationWindow(self.app, title=title)
+        window = ApplicationWindow(self.app, title=title, frame_aligned=self.frame_aligned)
         self.windows.append(window)
         return window
 
     def run(self, argv=None):
+        """
+        Run the application with an asyncio event loop on the GLib main context.
+
+        States set from other threads are applied on the main loop.
+        """
+        install_event_loop()
+        set_dispatcher(GLib.idle_add)
         for window in self.windows:
             self.app.connect("activate", window._activate)
         self.app.run(argv)
 
 
 class ApplicationWindow:
-    def __init__(self, app: Gtk.Application, title: str = "Untitled"):
+    def __init__(
+        self, app: "Gtk.Application", title: str = "Untitled", frame_aligned: bool = False
+    ):
         self.app = app
         self.title = title
-        self.composable: Composable[Gtk.Widget] | None = None
+        self.frame_aligned = frame_aligned
+        self.composable: Composable["Gtk.Widget"] | None = None
 
     def __enter__(self):
         return self
@@ -41,7 +56,7 @@ class ApplicationWindow:
         if self.content is None:
             raise ValueError("Window content is not set")
 
-    def set_content(self, content: Composable[Gtk.Widget]):
+    def set_content(self, content: Composable["Gtk.Widget"]):
         self.content = content
 
     def _activate(self, app):
@@ -49,8 +64,10 @@ class ApplicationWindow:
             raise ValueError("Window content is not set")
         window = Gtk.ApplicationWindow(application=app)
         window.set_title(self.title)
+        if self.frame_aligned and get_scheduler() is None:
+            set_scheduler(FrameClockScheduler(window))
         window.set_child(self.content.compose())
         window.present()
 
-    def __call__(self, composable: Composable[Gtk.Widget]) -> None:
+    def __call__(self, composable: Composable["Gtk.Widget"]) -> None:
         self.set_content(composable)
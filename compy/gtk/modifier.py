@@ -1,149 +1,168 @@
+import weakref
 from abc import ABC
-from typing import Callable, Self
+from typing import Any, Awaitable, Callable, Mapping
+
+from compy.aio import call_handler
+from compy.gtk.style import StyleSheet, style_declarations
+from compy.gtk.typelib import Gtk
+from compy.modifier import (
+    BackgroundModifier,
+    BorderModifier,
+    ClickableModifier,
+    ColorModifier,
+    FillModifier,
+    FontModifier,
+    ModifierBase,
+    ModifierElement,
+    PaddingModifier,
+    SizeModifier,
+    WeightModifier,
+)
+from compy.modifier import Modifier as ModifierChain
+from compy.state import batch
+
+__all__ = [
+    "BackgroundModifier",
+    "BorderModifier",
+    "ClickableModifier",
+    "ColorModifier",
+    "CompositeModifier",
+    "FillModifier",
+    "FontModifier",
+    "GtkModifier",
+    "Modifier",
+    "PaddingModifier",
+    "SizeModifier",
+    "WeightModifier",
+    "apply_properties",
+    "release_properties",
+]
+
+
+class GtkModifier(ModifierBase["Gtk.Widget"], ABC):
+    """Base class for GTK widget modifiers."""
 
-import gi
 
-from compy.modifier import ModifierBase, ModifierProtocol
+class CompositeModifier(GtkModifier):
+    """
+    Several modifiers applied as one.
 
-gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk  # type: ignore
+    Modifier elements and chains are merged into a single chain, so later
+    ones override earlier ones; other `GtkModifier`s are applied after it.
+    """
 
+    def __init__(self, *modifiers: "GtkModifier | ModifierElement | ModifierChain") -> None:
+        self.modifiers = modifiers
+        elements: list[ModifierElement] = []
+        for modifier in modifiers:
+            if isinstance(modifier, ModifierElement):
+                elements.append(modifier)
+            elif isinstance(modifier, ModifierChain):
+                elements.extend(modifier.elements)
+        self.chain = Modifier(tuple(elements))
+
+    def compile(self) -> Mapping[str, Any]:
+        return self.chain.compile()
+
+    def apply(self, widget: "Gtk.Widget") -> None:
+        self.chain.apply(widget)
+        for modifier in self.modifiers:
+            if not isinstance(modifier, ModifierElement | ModifierChain):
+                modifier.apply(widget)
 
-class GtkModifier(ModifierBase[Gtk.Widget], ABC):
-    """Base class for GTK widget modifiers."""
 
+class Modifier(ModifierChain):
+    """Modifier chain applied to GTK widgets."""
 
-class CompositeModifier(GtkModifier):
-    def __init__(self, *modifiers: GtkModifier) -> None:
-        self.modifiers = modifiers
+    __slots__ = ()
 
-    def apply(self, widget: Gtk.Widget) -> None:
-        for modifier in self.modifiers:
-            modifier.apply(widget)
+    def apply(self, widget: "Gtk.Widget") -> None:
+        apply_properties(widget, self.compile())
 
 
-class Modifier(ModifierProtocol):
-    def __init__(self) -> None:
-        self.modifiers = []
+# Compiled properties last applied to each widget, used to only issue the setters that differ.
+_applied: "weakref.WeakKeyDictionary[Gtk.Widget, Mapping[str, Any]]" = weakref.WeakKeyDictionary()
 
-    def apply(self, widget: Gtk.Widget) -> None:
-        for modifier in self.modifiers:
-            modifier.apply(widget)
-
-    def padding(self, *paddings: int) -> Self:
-        self.modifiers.append(PaddingModifier(*paddings))
-        return self
-
-    def background(self, color: str) -> Self:
-        self.modifiers.append(BackgroundModifier(color))
-        return self
-
-    def clickable(self, on_click: Callable[[], None]) -> Self:
-        self.modifiers.append(ClickableModifier(on_click))
-        return self
-
-    def fill_max_width(self) -> Self:
-        self.modifiers.append(FillModifier(hexpand=True, vexpand=False))
-        return self
-
-    def fill_max_height(self) -> Self:
-        self.modifiers.append(FillModifier(hexpand=False, vexpand=True))
-        return self
-
-    def fill_max_size(self) -> Self:
-        self.modifiers.append(FillModifier(hexpand=True, vexpand=True))
-        return self
-
-    def size(self, width: int, height: int) -> Self:
-        self.modifiers.append(SizeModifier(width, height))
-        return self
-
-    def width(self, width: int) -> Self:
-        self.modifiers.append(SizeModifier(width, None))
-        return self
-
-    def height(self, height: int) -> Self:
-        self.modifiers.append(SizeModifier(None, height))
-        return self
-
-
-class PaddingModifier(GtkModifier):
-    def __init__(self, *paddings: int) -> None:
-        """
-        Supports 1, 2, or 4 padding values.
-        1 value: all paddings
-        2 values: top/bottom, left/right
-        4 values: top, right, bottom, left
-        """
-        self.padding_top = 0
-        self.padding_right = 0
-        self.padding_bottom = 0
-        self.padding_left = 0
-
-        match len(paddings):
-            case 1:
-                self.padding_top = paddings[0]
-                self.padding_right = paddings[0]
-                self.padding_bottom = paddings[0]
-                self.padding_left = paddings[0]
-            case 2:
-                self.padding_top = paddings[0]
-                self.padding_right = paddings[1]
-                self.padding_bottom = paddings[0]
-                self.padding_left = paddings[1]
-            case 4:
-                self.padding_top = paddings[0]
-                self.padding_right = paddings[1]
-                self.padding_bottom = paddings[2]
-                self.padding_left = paddings[3]
-            case _:
-                raise ValueError("Padding must have 1, 2, or 4 values")
-
-    def apply(self, widget: Gtk.Widget) -> None:
-        widget.set_margin_start(self.padding_left)
-        widget.set_margin_end(self.padding_right)
-        widget.set_margin_top(self.padding_top)
-        widget.set_margin_bottom(self.padding_bottom)
-
-
-class BackgroundModifier(GtkModifier):
-    def __init__(self, color: str) -> None:
-        self.color = color
-
-    def apply(self, widget: Gtk.Widget) -> None:
-        style_context = widget.get_style_context()
-        style_context.add_class(f"background-{self.color}")
-
-
-class ClickableModifier(GtkModifier):
-    def __init__(self, on_click: Callable[[], None]) -> None:
-        self.on_click = on_click
-
-    def apply(self, widget: Gtk.Widget) -> None:
-        if isinstance(widget, Gtk.Button):
-            widget.connect("clicked", lambda _: self.on_click())
-        else:
-            gesture = Gtk.GestureClick.new()
-            gesture.connect("released", lambda *_: self.on_click())
-            widget.add_controller(gesture)
+
+def apply_properties(widget: "Gtk.Widget", properties: Mapping[str, Any]) -> None:
+    """Apply compiled modifier properties, calling only the setters whose value changed."""
+    previous = _applied.get(widget, {})
+    if properties is previous:
+        return
+    size = (properties.get("width", -1), properties.get("height", -1))
+    if size != (previous.get("width", -1), previous.get("height", -1)):
+        widget.set_size_request(*size)
+    style, old_style = style_declarations(properties), style_declarations(previous)
+    if style != old_style:
+        stylesheet = StyleSheet.for_display(widget.get_display())
+        if old_style:
+            widget.remove_css_class(stylesheet.release(old_style))
+        if style:
+            widget.add_css_class(stylesheet.acquire(style))
+    for name in previous.keys() - properties.keys():
+        if name in _SETTERS:
+            _SETTERS[name](widget, _DEFAULTS[name], previous[name])
+    for name, value in properties.items():
+        old = previous.get(name, _DEFAULTS.get(name))
+        if name in _SETTERS and value != old:
+            _SETTERS[name](widget, value, old)
+    _applied[widget] = properties
 
 
-class FillModifier(GtkModifier):
-    def __init__(self, hexpand: bool, vexpand: bool) -> None:
-        self.hexpand = hexpand
-        self.vexpand = vexpand
+def release_properties(widget: "Gtk.Widget") -> None:
+    """Release the shared resources held for a widget that is no longer used."""
+    previous = _applied.pop(widget, None)
+    if previous is not None and (style := style_declarations(previous)):
+        StyleSheet.for_display(widget.get_display()).release(style)
 
-    def apply(self, widget: Gtk.Widget) -> None:
-        if self.hexpand:
-            widget.set_hexpand(True)
-        if self.vexpand:
-            widget.set_vexpand(True)
 
+class ClickBinding:
+    """Click handler connected to a widget once and swapped in place"""
 
-class SizeModifier(GtkModifier):
-    def __init__(self, width: int | None, height: int | None) -> None:
-        self.width = width if width is not None else -1
-        self.height = height if height is not None else -1
+    def __init__(self, widget: "Gtk.Widget") -> None:
+        self.widget = weakref.ref(widget)
+        self.on_click: Callable[[], Awaitable[None] | None] | None = None
+        if isinstance(widget, Gtk.Button):
+            widget.connect("clicked", lambda _: self._handle())
+        else:
+            gesture = Gtk.GestureClick.new()
+            gesture.connect("released", lambda *_: self._handle())
+            widget.add_controller(gesture)
 
-    def apply(self, widget: Gtk.Widget) -> None:
-        widget.set_size_request(self.width, self.height)
+    @batch()
+    def _handle(self) -> None:
+        if self.on_click is not None:
+            call_handler(self.on_click, owner=self.widget())
+
+
+_click_bindings: "weakref.WeakKeyDictionary[Gtk.Widget, ClickBinding]" = weakref.WeakKeyDictionary()
+
+
+def _set_on_click(widget: "Gtk.Widget", on_click: Any, _: Any) -> None:
+    binding = _click_bindings.get(widget)
+    if binding is None:
+        if on_click is None:
+            return
+        binding = _click_bindings[widget] = ClickBinding(widget)
+    binding.on_click = on_click
+
+
+_SETTERS: dict[str, Callable[["Gtk.Widget", Any, Any], None]] = {
+    "margin_top": lambda widget, value, _: widget.set_margin_top(value),
+    "margin_end": lambda widget, value, _: widget.set_margin_end(value),
+    "margin_bottom": lambda widget, value, _: widget.set_margin_bottom(value),
+    "margin_start": lambda widget, value, _: widget.set_margin_start(value),
+    "hexpand": lambda widget, value, _: widget.set_hexpand(value),
+    "vexpand": lambda widget, value, _: widget.set_vexpand(value),
+    "on_click": _set_on_click,
+}
+
+_DEFAULTS: dict[str, Any] = {
+    "margin_top": 0,
+    "margin_end": 0,
+    "margin_bottom": 0,
+    "margin_start": 0,
+    "hexpand": False,
+    "vexpand": False,
+    "on_click": None,
+}
@@ -0,0 +1,45 @@
+"""GTK schedulers flushing composable updates once per frame"""
+
+from compy.gtk.typelib import Gdk, GLib, Gtk
+from compy.scheduler import Scheduler
+
+
+class IdleScheduler(Scheduler):
+    """Flushes from a GLib idle source, for main loops without a frame clock"""
+
+    def request_flush(self) -> None:
+        GLib.idle_add(self._on_idle)
+
+    def _on_idle(self) -> bool:
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+
+class FrameClockScheduler(IdleScheduler):
+    """Flushes in the update phase of a widget's Gdk.FrameClock"""
+
+    def __init__(self, widget: "Gtk.Widget") -> None:
+        super().__init__()
+        self.widget = widget
+        self._clock: Gdk.FrameClock | None = None
+        self._handler = 0
+
+    def request_flush(self) -> None:
+        clock = self.widget.get_frame_clock()
+        if clock is None:
+            # Not realized yet, so there are no frames to align with.
+            super().request_flush()
+            return
+        if clock is not self._clock:
+            # The widget moved to another surface: stop following the old clock.
+            if self._clock is not None:
+                self._clock.disconnect(self._handler)
+            self._handler = clock.connect("update", self._on_update)
+            self._clock = clock
+        clock.request_phase(Gdk.FrameClockPhase.UPDATE)
+
+    def _on_update(self, _: "Gdk.FrameClock") -> None:
+        # The update phase runs on every frame, e.g. during animations, not
+        # only on the frames requested here.
+        if self._requested or self._dirty:
+            self.flush()
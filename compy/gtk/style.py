@@ -0,0 +1,141 @@
+"""Display-wide stylesheet for style modifiers"""
+
+from itertools import count
+from typing import Any, Mapping
+
+from compy.gtk.typelib import Gdk, GLib, Gtk
+
+type Declarations = tuple[tuple[str, str], ...]
+
+
+def style_declarations(properties: Mapping[str, Any]) -> Declarations:
+    """CSS declarations for the style properties of a compiled modifier"""
+    declarations: list[tuple[str, str]] = []
+    if (background := properties.get("background")) is not None:
+        declarations += [("background-color", background), ("background-image", "none")]
+    if (color := properties.get("color")) is not None:
+        declarations.append(("color", color))
+    if (border := properties.get("border")) is not None:
+        width, color, radius = border
+        declarations += [("border", f"{width}px solid {color}"), ("border-radius", f"{radius}px")]
+    if (font := properties.get("font")) is not None:
+        family, size, weight = font
+        if family is not None:
+            declarations.append(("font-family", family))
+        if size is not None:
+            declarations.append(("font-size", f"{size}pt"))
+        if weight is not None:
+            declarations.append(("font-weight", str(weight)))
+    return tuple(declarations)
+
+
+class StyleClass:
+    """Generated CSS class shared by every widget with the same declarations"""
+
+    def __init__(self, name: str, declarations: Declarations, chunk: "StyleChunk") -> None:
+        self.name = name
+        self.declarations = declarations
+        self.chunk = chunk
+        self.references = 0
+
+    def rule(self) -> str:
+        body = " ".join(f"{prop}: {value};" for prop, value in self.declarations)
+        return f".{self.name} {{ {body} }}"
+
+
+class StyleChunk:
+    """A bounded group of rules loaded into one Gtk.CssProvider"""
+
+    def __init__(self, display: "Gdk.Display") -> None:
+        self.classes: dict[str, StyleClass] = {}
+        self.unused = 0
+        self.provider = Gtk.CssProvider()
+        Gtk.StyleContext.add_provider_for_display(
+            display, self.provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+
+    def load(self) -> None:
+        css = "\n".join(style.rule() for style in self.classes.values())
+        if hasattr(self.provider, "load_from_string"):
+            self.provider.load_from_string(css)
+        else:
+            self.provider.load_from_data(css.encode())
+
+
+class StyleSheet:
+    """
+    Stylesheet of generated classes shared by all widgets of a display.
+
+    Style modifiers with equal declarations share one class. New rules are
+    appended to the newest chunk, and only the chunks that changed are
+    reloaded, once per main loop iteration and before the next frame. A
+    class no longer used by any widget is collected when enough of its
+    chunk is unused.
+    """
+
+    chunk_size = 256
+
+    _sheets: dict["Gdk.Display", "StyleSheet"] = {}
+
+    @classmethod
+    def for_display(cls, display: "Gdk.Display") -> "StyleSheet":
+        sheet = cls._sheets.get(display)
+        if sheet is None:
+            sheet = cls._sheets[display] = cls(display)
+        return sheet
+
+    def __init__(self, display: "Gdk.Display") -> None:
+        self.display = display
+        self._classes: dict[Declarations, StyleClass] = {}
+        self._chunks: list[StyleChunk] = []
+        self._dirty: dict[StyleChunk, None] = {}
+        self._names = count()
+
+    def acquire(self, declarations: Declarations) -> str:
+        """Return the class for `declarations`, creating its rule if needed"""
+        style = self._classes.get(declarations)
+        if style is None:
+            chunk = self._open_chunk()
+            style = StyleClass(f"compy-style-{next(self._names)}", declarations, chunk)
+            chunk.classes[style.name] = style
+            self._classes[declarations] = style
+            self._mark_dirty(chunk)
+        elif style.references == 0:
+            style.chunk.unused -= 1
+        style.references += 1
+        return style.name
+
+    def release(self, declarations: Declarations) -> str:
+        """Drop one use of the class for `declarations` and return its name"""
+        style = self._classes[declarations]
+        style.references -= 1
+        if style.references == 0:
+            chunk = style.chunk
+            chunk.unused += 1
+            if chunk.unused * 2 > self.chunk_size:
+                self._collect(chunk)
+        return style.name
+
+    def _open_chunk(self) -> StyleChunk:
+        if not self._chunks or len(self._chunks[-1].classes) >= self.chunk_size:
+            self._chunks.append(StyleChunk(self.display))
+        return self._chunks[-1]
+
+    def _collect(self, chunk: StyleChunk) -> None:
+        for name, style in list(chunk.classes.items()):
+            if style.references == 0:
+                del chunk.classes[name]
+                del self._classes[style.declarations]
+        chunk.unused = 0
+        self._mark_dirty(chunk)
+
+    def _mark_dirty(self, chunk: StyleChunk) -> None:
+        if not self._dirty:
+            GLib.idle_add(self._load, priority=GLib.PRIORITY_HIGH_IDLE)
+        self._dirty[chunk] = None
+
+    def _load(self) -> bool:
+        for chunk in self._dirty:
+            chunk.load()
+        self._dirty.clear()
+        return GLib.SOURCE_REMOVE
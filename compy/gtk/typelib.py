@@ -0,0 +1,36 @@
+"""GObject typelibs loaded on first use"""
+
+from importlib import import_module
+from typing import Any
+
+
+class Typelib:
+    """
+    A `gi.repository` namespace imported the first time one of its attributes is read.
+
+    Modules that only call into GTK at runtime use these instead of importing
+    `gi.repository` directly, so importing them does not load the typelib.
+    """
+
+    def __init__(self, namespace: str, version: str | None = None) -> None:
+        self._namespace = namespace
+        self._version = version
+        self._module: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        module = self._module
+        if module is None:
+            if self._version is not None:
+                import gi  # type: ignore
+
+                gi.require_version(self._namespace, self._version)
+            module = self._module = import_module(f"gi.repository.{self._namespace}")
+        return getattr(module, name)
+
+    def __repr__(self) -> str:
+        return f"<Typelib {self._namespace} {self._version or ''}>"
+
+
+Gdk = Typelib("Gdk", "4.0")
+GLib = Typelib("GLib")
+Gtk = Typelib("Gtk", "4.0")
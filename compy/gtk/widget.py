@@ -1,14 +1,20 @@
 """GTK implementations of the Widget class"""
 
-from typing import Any, override
+from typing import Any, Awaitable, Callable, Collection, Sequence, override
 
 import gi
 
-from compy.modifier import ModifierProtocol
+from compy.modifier import Modifier as ModifierChain
+from compy.modifier import ModifierElement, ModifierProtocol
+from compy.state import Subscription, batch
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk  # type: ignore
+from gi.repository import Gio, GObject, Gtk  # type: ignore
 
+from compy.aio import call_handler, cancel_tasks
+from compy.collections import ListMove
+from compy.composable import Composable
+from compy.gtk.modifier import apply_properties, release_properties
 from compy.widget import Widget
 
 
@@ -22,8 +28,8 @@ class ManagedBox(Gtk.Box):
     @override
     def append(self, child: Gtk.Widget) -> None:
         """Append a child widget to the box"""
+        super().append(child)
         self.children.append(child)
-        self.append(child)
 
     @override
     def prepend(self, child: Gtk.Widget) -> None:
@@ -33,18 +39,24 @@ class ManagedBox(Gtk.Box):
     @override
     def remove(self, child: Gtk.Widget) -> None:
         """Remove a child widget from the box"""
+        super().remove(child)
         self.children.remove(child)
-        self.remove(child)
 
     @override
     def insert_child_after(self, child: Gtk.Widget, sibling: Gtk.Widget | None = None) -> None:
-        super().insert_child_after(child, sibling)
-        self.children.insert(self.children.index(sibling) + 1, child)
+        """Insert a child after sibling, moving it if it is already in the box"""
+        if child.get_parent() is self:
+            super().reorder_child_after(child, sibling)
+            self.children.remove(child)
+        else:
+            super().insert_child_after(child, sibling)
+        index = 0 if sibling is None else self.children.index(sibling) + 1
+        self.children.insert(index, child)
 
     def clear(self) -> None:
         """Remove all children from the box"""
         for child in self.children:
-            self.remove(child)
+            super().remove(child)
         self.children.clear()
 
     def set_children(self, children: list[Gtk.Widget]) -> None:
@@ -54,84 +66,290 @@ class ManagedBox(Gtk.Box):
             self.append(child)
 
 
+class ManagedButton(Gtk.Button):
+    """Gtk.Button whose click handler is connected once and swapped in place"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.on_click: Callable[[], Awaitable[None] | None] | None = None
+        self.connect("clicked", self._on_clicked)
+
+    def _on_clicked(self, _: Gtk.Button) -> None:
+        if self.on_click is not None:
+            with batch():
+                call_handler(self.on_click, owner=self)
+
+
+class ItemValue(GObject.Object):
+    """GObject wrapper handing a Python value to a list item"""
+
+    def __init__(self, value: Any):
+        super().__init__()
+        self.value = value
+
+
+class ItemListModel(GObject.Object, Gio.ListModel):
+    """
+    Gio.ListModel over a Python sequence, wrapping items only when requested
+
+    Bound to the change records of a list state, it reports each change as
+    the range of items it touched instead of replacing every item.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.items: Sequence[Any] = []
+        self.changes: Callable[..., Subscription] | None = None
+        self.subscription: Subscription | None = None
+
+    def do_get_item_type(self) -> GObject.GType:
+        return ItemValue.__gtype__
+
+    def do_get_n_items(self) -> int:
+        return len(self.items)
+
+    def do_get_item(self, position: int) -> ItemValue | None:
+        if position >= len(self.items):
+            return None
+        return ItemValue(self.items[position])
+
+    def set_items(
+        self, items: Sequence[Any], changes: Callable[..., Subscription] | None = None
+    ) -> bool:
+        """
+        Show `items`, or follow the records of `changes`, a `subscribe_changes` method
+
+        Returns False when the model already follows `changes`, leaving its items in place.
+        """
+        if changes is not None and changes == self.changes:
+            return False  # Kept up to date by the change records
+        if self.subscription is not None:
+            self.subscription.dispose()
+            self.subscription = None
+        self.changes = changes
+        removed = len(self.items)
+        if changes is None:
+            self.items = items
+            self.items_changed(0, removed, len(items))
+            return True
+        self.items = []
+        if removed:
+            self.items_changed(0, removed, 0)
+        self.subscription = changes(self._apply_changes)
+        return True
+
+    def refresh(self) -> None:
+        """Report every item as replaced, so that the view binds its rows again"""
+        count = len(self.items)
+        if count:
+            self.items_changed(0, count, count)
+
+    def _apply_changes(self, changes: list[Any]) -> None:
+        items = self.items
+        for change in changes:
+            if isinstance(change, ListMove):
+                items.insert(change.target, items.pop(change.source))
+                start = min(change.source, change.target)
+                count = abs(change.source - change.target) + 1
+                self.items_changed(start, count, count)
+            else:
+                index, removed = change.index, len(change.removed)
+                items[index : index + removed] = change.added
+                self.items_changed(index, removed, len(change.added))
+
+
+class ManagedListView(Gtk.ScrolledWindow):
+    """Scrolled Gtk.ListView composing rows on bind and recycling their widgets"""
+
+    def __init__(self, orientation: Gtk.Orientation, **kwargs):
+        super().__init__(**kwargs)
+        self.item: Callable[[Any], Composable] | None = None
+        self.rows: dict[Gtk.ListItem, Composable] = {}
+        self.model = ItemListModel()
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("bind", self._bind)
+        factory.connect("teardown", self._teardown)
+        self.list_view = Gtk.ListView(
+            model=Gtk.NoSelection(model=self.model), factory=factory, orientation=orientation
+        )
+        if orientation == Gtk.Orientation.HORIZONTAL:
+            self.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.NEVER)
+        self.set_child(self.list_view)
+
+    def _bind(self, _: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        if self.item is None:
+            return
+        row = self.item(list_item.get_item().value)
+        previous = self.rows.get(list_item)
+        if previous is not None and type(previous.widget) is type(row.widget):
+            # Recycle the widgets of the row this list item showed before.
+            row.adopt(previous)
+        else:
+            if previous is not None:
+                previous.dispose()
+            list_item.set_child(row.compose())
+        self.rows[list_item] = row
+
+    def _teardown(self, _: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        row = self.rows.pop(list_item, None)
+        if row is not None:
+            row.dispose()
+
+    def clear(self) -> None:
+        """Dispose all composed rows"""
+        for row in self.rows.values():
+            row.dispose()
+        self.rows.clear()
+
+
 class GtkWidget[T: Gtk.Widget](Widget[T]):
-    def update(self, instance: T, props: dict[str, Any]) -> None:
-        modifier = props.get("modifier")
-        if modifier:
-            self.apply_modifier(instance, modifier)
+    def update(
+        self, instance: T, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        if changed is None or "modifier" in changed:
+            modifier = props.get("modifier")
+            if modifier is not None:
+                self.apply_modifier(instance, modifier)
+            elif changed is not None:
+                apply_properties(instance, {})
 
     def apply_modifier(self, instance: T, modifier: ModifierProtocol[Gtk.Widget]) -> None:
-        modifier.apply(instance)
+        if isinstance(modifier, ModifierChain | ModifierElement):
+            apply_properties(instance, modifier.compile())
+        else:
+            modifier.apply(instance)  # type: ignore[attr-defined]
+
+    def dispose(self, instance: T) -> None:
+        cancel_tasks(instance)
+        release_properties(instance)
 
 
 class GtkTextWidget(GtkWidget[Gtk.Label]):
     def create(self) -> Gtk.Label:
         return Gtk.Label()
 
-    def update(self, instance: Gtk.Label, props: dict[str, Any]) -> None:
-        super().update(instance, props)
-        text = props.get("text")
-        if text:
-            instance.set_text(text)
+    def update(
+        self, instance: Gtk.Label, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or "text" in changed:
+            instance.set_text(props.get("text") or "")
 
     def set_content(self, instance: Gtk.Label, content: list[Gtk.Widget]) -> None:
         raise ValueError("Text widget cannot set content")
 
+    def insert_child_after(
+        self, instance: Gtk.Label, child: Gtk.Widget, sibling: Gtk.Widget | None
+    ) -> None:
+        raise ValueError("Text widget cannot set content")
 
-class GtkButtonWidget(GtkWidget[Gtk.Button]):
-    def create(self) -> Gtk.Button:
-        return Gtk.Button()
+    def remove_child(self, instance: Gtk.Label, child: Gtk.Widget) -> None:
+        raise ValueError("Text widget cannot set content")
 
-    def update(self, instance: Gtk.Button, props: dict[str, Any]) -> None:
-        super().update(instance, props)
-        onclick = props.get("onclick")
-        if onclick:
-            instance.connect("clicked", lambda _: onclick())
 
-    def set_content(self, instance: Gtk.Button, content: list[Gtk.Widget]) -> None:
+class GtkButtonWidget(GtkWidget[ManagedButton]):
+    def create(self) -> ManagedButton:
+        return ManagedButton()
+
+    def update(
+        self, instance: ManagedButton, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or "onclick" in changed:
+            instance.on_click = props.get("onclick")
+
+    def set_content(self, instance: ManagedButton, content: list[Gtk.Widget]) -> None:
         assert len(content) == 1, "Button can only have one child"
         instance.set_child(content[0])
 
+    def insert_child_after(
+        self, instance: ManagedButton, child: Gtk.Widget, sibling: Gtk.Widget | None
+    ) -> None:
+        assert sibling is None, "Button can only have one child"
+        instance.set_child(child)
 
-class GtkBoxWidget(GtkWidget[Gtk.Box]):
-    def create(self) -> Gtk.Box:
-        return Gtk.Box()
+    def remove_child(self, instance: ManagedButton, child: Gtk.Widget) -> None:
+        if instance.get_child() is child:
+            instance.set_child(None)
 
-    def update(self, instance: Gtk.Box, props: dict[str, Any]) -> None:
-        super().update(instance, props)
-        orientation = (
-            Gtk.Orientation.VERTICAL
-            if props["orientation"] == "vertical"
-            else Gtk.Orientation.HORIZONTAL
-        )
-        instance.set_orientation(orientation)
 
-    def set_content(self, instance: Gtk.Box, content: list[Gtk.Widget]) -> None:
+class GtkContainerWidget(GtkWidget[ManagedBox]):
+    def set_content(self, instance: ManagedBox, content: list[Gtk.Widget]) -> None:
         for child in content:
             instance.append(child)
 
+    def insert_child_after(
+        self, instance: ManagedBox, child: Gtk.Widget, sibling: Gtk.Widget | None
+    ) -> None:
+        instance.insert_child_after(child, sibling)
 
-class GtkRowWidget(GtkWidget[Gtk.Box]):
-    def create(self) -> Gtk.Box:
-        return Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+    def remove_child(self, instance: ManagedBox, child: Gtk.Widget) -> None:
+        instance.remove(child)
 
-    def update(self, instance: Gtk.Box, props: dict[str, Any]) -> None:
-        super().update(instance, props)
-        instance.set_orientation(Gtk.Orientation.HORIZONTAL)
 
-    def set_content(self, instance: Gtk.Box, content: list[Gtk.Widget]) -> None:
-        for child in content:
-            instance.append(child)
+class GtkBoxWidget(GtkContainerWidget):
+    def create(self) -> ManagedBox:
+        return ManagedBox()
 
+    def update(
+        self, instance: ManagedBox, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or "orientation" in changed:
+            orientation = (
+                Gtk.Orientation.VERTICAL
+                if props["orientation"] == "vertical"
+                else Gtk.Orientation.HORIZONTAL
+            )
+            instance.set_orientation(orientation)
 
-class GtkColumnWidget(GtkWidget[Gtk.Box]):
-    def create(self) -> Gtk.Box:
-        return Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
 
-    def update(self, instance: Gtk.Box, props: dict[str, Any]) -> None:
-        super().update(instance, props)
-        instance.set_orientation(Gtk.Orientation.VERTICAL)
+class GtkRowWidget(GtkContainerWidget):
+    def create(self) -> ManagedBox:
+        return ManagedBox(orientation=Gtk.Orientation.HORIZONTAL)
 
-    def set_content(self, instance: Gtk.Box, content: list[Gtk.Widget]) -> None:
-        for child in content:
-            instance.append(child)
+
+class GtkColumnWidget(GtkContainerWidget):
+    def create(self) -> ManagedBox:
+        return ManagedBox(orientation=Gtk.Orientation.VERTICAL)
+
+
+class GtkLazyColumnWidget(GtkWidget[ManagedListView]):
+    orientation = Gtk.Orientation.VERTICAL
+
+    def create(self) -> ManagedListView:
+        return ManagedListView(self.orientation)
+
+    def update(
+        self,
+        instance: ManagedListView,
+        props: dict[str, Any],
+        changed: Collection[str] | None = None,
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or not {"item", "items", "changes"}.isdisjoint(changed):
+            instance.item = props["item"]
+            replaced = instance.model.set_items(props["items"], props.get("changes"))
+            if not replaced and changed is not None and "item" in changed:
+                instance.model.refresh()  # Same items, composed by another function
+
+    def set_content(self, instance: ManagedListView, content: list[Gtk.Widget]) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def insert_child_after(
+        self, instance: ManagedListView, child: Gtk.Widget, sibling: Gtk.Widget | None
+    ) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def remove_child(self, instance: ManagedListView, child: Gtk.Widget) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def dispose(self, instance: ManagedListView) -> None:
+        super().dispose(instance)
+        instance.clear()
+        instance.model.set_items(())
+
+
+class GtkLazyRowWidget(GtkLazyColumnWidget):
+    orientation = Gtk.Orientation.HORIZONTAL
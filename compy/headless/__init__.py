@@ -0,0 +1,32 @@
+from compy.headless.widget import (
+    HeadlessBoxWidget,
+    HeadlessButtonWidget,
+    HeadlessColumnWidget,
+    HeadlessLazyColumnWidget,
+    HeadlessLazyRowWidget,
+    HeadlessRowWidget,
+    HeadlessTextWidget,
+    operations,
+)
+from compy.widget import (
+    BoxWidget,
+    ButtonWidget,
+    ColumnWidget,
+    LazyColumnWidget,
+    LazyRowWidget,
+    RowWidget,
+    TextWidget,
+    Widget,
+)
+
+HEADLESS_IMPLEMENTATIONS: dict[type[Widget], type[Widget]] = {
+    TextWidget: HeadlessTextWidget,
+    ButtonWidget: HeadlessButtonWidget,
+    BoxWidget: HeadlessBoxWidget,
+    RowWidget: HeadlessRowWidget,
+    ColumnWidget: HeadlessColumnWidget,
+    LazyColumnWidget: HeadlessLazyColumnWidget,
+    LazyRowWidget: HeadlessLazyRowWidget,
+}
+
+__all__ = ["HEADLESS_IMPLEMENTATIONS", "operations"]
@@ -0,0 +1,247 @@
+"""Headless implementations of the Widget class, backed by an in-memory node tree"""
+
+from collections import Counter
+from typing import Any, Callable, Collection, Sequence
+
+from compy.composable import Composable
+from compy.layout import HORIZONTAL, VERTICAL, LayoutNode
+from compy.modifier import ModifierProtocol
+from compy.widget import Widget
+
+
+class OperationCounter:
+    """Totals of widget operations across all headless nodes"""
+
+    def __init__(self) -> None:
+        self.totals: Counter[str] = Counter()
+
+    def __getitem__(self, operation: str) -> int:
+        return self.totals[operation]
+
+    def reset(self) -> None:
+        self.totals.clear()
+
+
+# Global operation counter
+operations = OperationCounter()
+
+# Size of a character of text, for layout
+CHAR_WIDTH = 8
+LINE_HEIGHT = 16
+
+
+class HeadlessNode(LayoutNode):
+    """In-memory widget instance counting the operations applied to it"""
+
+    __slots__ = ("kind", "props", "modifier", "counts", "__weakref__")
+
+    hidden_props: tuple[str, ...] = ("modifier",)
+
+    children: list["HeadlessNode"]  # type: ignore[assignment]
+    parent: "HeadlessNode | None"  # type: ignore[assignment]
+
+    def __init__(self, kind: str, direction: str = VERTICAL) -> None:
+        super().__init__(direction)
+        self.kind = kind
+        self.props: dict[str, Any] = {}
+        self.modifier: ModifierProtocol | None = None
+        self.counts: dict[str, int] = {}
+
+    def count(self, operation: str) -> None:
+        self.counts[operation] = self.counts.get(operation, 0) + 1
+        operations.totals[operation] += 1
+
+    def render(self, indent: int = 0) -> str:
+        """Render the subtree to a string for debugging"""
+        props = ", ".join(
+            f"{key}={value!r}" for key, value in self.props.items() if key not in self.hidden_props
+        )
+        lines = [f"{'  ' * indent}{self.kind}({props})"]
+        lines.extend(child.render(indent + 1) for child in self.children)
+        return "\n".join(lines)
+
+
+class HeadlessListNode(HeadlessNode):
+    """Lazy list node composing only the rows inside its viewport"""
+
+    hidden_props = ("modifier", "items", "item", "changes")
+
+    def __init__(self, kind: str, direction: str = VERTICAL, visible: int = 20) -> None:
+        super().__init__(kind, direction)
+        self.item: Callable[[Any], Composable] | None = None
+        self.items: Sequence[Any] = []
+        self.first = 0
+        self.visible = visible
+        self.rows: list[Composable] = []
+
+    def scroll_to(self, first: int) -> None:
+        """Move the viewport, recycling the widgets of the rows already composed"""
+        self.first = first
+        self.bind()
+
+    def bind(self) -> None:
+        # Clamped here, as the items may have shrunk below the viewport.
+        self.first = max(0, min(self.first, len(self.items) - self.visible))
+        values = self.items[self.first : self.first + self.visible] if self.item else []
+        rows = [self.item(value) for value in values] if self.item else []
+        for index, row in enumerate(rows):
+            previous = self.rows[index] if index < len(self.rows) else None
+            if previous is not None and type(previous.widget) is type(row.widget):
+                row.adopt(previous)
+            elif previous is not None:
+                previous.dispose()
+        for previous in self.rows[len(rows) :]:
+            previous.dispose()
+        self.rows = rows
+        self.children = [row.compose() for row in rows]
+        for child in self.children:
+            child.parent = self
+        self.invalidate()
+        self.count("content")
+
+    def clear(self) -> None:
+        """Dispose all composed rows"""
+        for row in self.rows:
+            row.dispose()
+        self.rows = []
+        self.children = []
+        self.invalidate()
+
+
+class HeadlessWidget(Widget[HeadlessNode]):
+    kind = "widget"
+    direction = VERTICAL
+
+    def create(self) -> HeadlessNode:
+        node = HeadlessNode(self.kind, self.direction)
+        node.count("create")
+        return node
+
+    def update(
+        self, instance: HeadlessNode, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        instance.count("update")
+        keys = props.keys() if changed is None else changed
+        for key in keys:
+            instance.props[key] = props[key]
+        if "modifier" in keys and props.get("modifier") is not None:
+            self.apply_modifier(instance, props["modifier"])
+        elif "modifier" in keys:
+            instance.set_properties({})
+
+    def set_content(self, instance: HeadlessNode, content: list[HeadlessNode]) -> None:
+        instance.count("content")
+        for child in instance.children:
+            child.parent = None
+        instance.children = list(content)
+        for child in content:
+            child.parent = instance
+        instance.invalidate()
+
+    def insert_child_after(
+        self, instance: HeadlessNode, child: HeadlessNode, sibling: HeadlessNode | None
+    ) -> None:
+        instance.count("content")
+        if child.parent is instance:
+            instance.children.remove(child)
+        index = 0 if sibling is None else instance.children.index(sibling) + 1
+        instance.children.insert(index, child)
+        child.parent = instance
+        instance.invalidate()
+
+    def remove_child(self, instance: HeadlessNode, child: HeadlessNode) -> None:
+        instance.count("content")
+        instance.children.remove(child)
+        child.parent = None
+        instance.invalidate()
+
+    def apply_modifier(self, instance: HeadlessNode, modifier: ModifierProtocol) -> None:
+        instance.count("modifier")
+        instance.modifier = modifier
+        instance.set_properties(modifier.compile())
+
+    def render(self, instance: HeadlessNode) -> str:
+        return instance.render()
+
+
+class HeadlessTextWidget(HeadlessWidget):
+    kind = "text"
+
+    def update(
+        self, instance: HeadlessNode, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or "text" in changed:
+            instance.set_intrinsic((len(str(props.get("text", ""))) * CHAR_WIDTH, LINE_HEIGHT))
+
+    def set_content(self, instance: HeadlessNode, content: list[HeadlessNode]) -> None:
+        raise ValueError("Text widget cannot set content")
+
+    def insert_child_after(
+        self, instance: HeadlessNode, child: HeadlessNode, sibling: HeadlessNode | None
+    ) -> None:
+        raise ValueError("Text widget cannot set content")
+
+    def remove_child(self, instance: HeadlessNode, child: HeadlessNode) -> None:
+        raise ValueError("Text widget cannot set content")
+
+
+class HeadlessButtonWidget(HeadlessWidget):
+    kind = "button"
+
+    def set_content(self, instance: HeadlessNode, content: list[HeadlessNode]) -> None:
+        assert len(content) == 1, "Button can only have one child"
+        super().set_content(instance, content)
+
+
+class HeadlessBoxWidget(HeadlessWidget):
+    kind = "box"
+
+
+class HeadlessRowWidget(HeadlessWidget):
+    kind = "row"
+    direction = HORIZONTAL
+
+
+class HeadlessColumnWidget(HeadlessWidget):
+    kind = "column"
+
+
+class HeadlessLazyColumnWidget(HeadlessWidget):
+    kind = "lazy_column"
+
+    def create(self) -> HeadlessListNode:
+        node = HeadlessListNode(self.kind, self.direction)
+        node.count("create")
+        return node
+
+    def update(
+        self,
+        instance: HeadlessListNode,
+        props: dict[str, Any],
+        changed: Collection[str] | None = None,
+    ) -> None:
+        super().update(instance, props, changed)
+        if changed is None or "item" in changed or "items" in changed:
+            instance.item = props["item"]
+            instance.items = props["items"]
+            instance.bind()
+
+    def set_content(self, instance: HeadlessNode, content: list[HeadlessNode]) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def insert_child_after(
+        self, instance: HeadlessNode, child: HeadlessNode, sibling: HeadlessNode | None
+    ) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def remove_child(self, instance: HeadlessNode, child: HeadlessNode) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def dispose(self, instance: HeadlessListNode) -> None:
+        instance.clear()
+
+
+class HeadlessLazyRowWidget(HeadlessLazyColumnWidget):
+    kind = "lazy_row"
+    direction = HORIZONTAL
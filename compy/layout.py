@@ -0,0 +1,292 @@
+"""
+Backend-neutral layout of rows and columns.
+
+Nodes are measured under constraints and every measurement is cached on the
+node, keyed by the constraints, until the node is invalidated. Invalidating a
+node clears its own cache and its ancestors', so the next layout pass only
+re-measures the path to the root: other subtrees answer from their caches,
+and are only moved when their position changed.
+
+Layout properties are read from compiled modifiers: `margin_*` (padding),
+`width`/`height` (fixed size), `hexpand`/`vexpand` (fill the available space)
+and `weight` (share of the space left in a row or column).
+"""
+
+import math
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, Mapping
+
+HORIZONTAL = "horizontal"
+VERTICAL = "vertical"
+
+# Measurements and arrangements actually computed rather than served from caches.
+stats: Counter[str] = Counter()
+
+_NO_PROPERTIES: Mapping[str, Any] = MappingProxyType({})
+
+# Measurements kept per node; a node is rarely measured under more constraints.
+_CACHE_SIZE = 4
+
+
+class Constraints:
+    """Minimum and maximum width and height a node may take."""
+
+    __slots__ = ("min_width", "max_width", "min_height", "max_height")
+
+    def __init__(
+        self,
+        min_width: float = 0,
+        max_width: float = math.inf,
+        min_height: float = 0,
+        max_height: float = math.inf,
+    ) -> None:
+        self.min_width = min_width
+        self.max_width = max_width
+        self.min_height = min_height
+        self.max_height = max_height
+
+    @classmethod
+    def tight(cls, width: float, height: float) -> "Constraints":
+        return cls(width, width, height, height)
+
+    def _key(self) -> tuple[float, float, float, float]:
+        return (self.min_width, self.max_width, self.min_height, self.max_height)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Constraints) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"Constraints{self._key()}"
+
+    def constrain(self, width: float, height: float) -> tuple[float, float]:
+        """Clamp a size to these constraints."""
+        return (
+            min(max(width, self.min_width), self.max_width),
+            min(max(height, self.min_height), self.max_height),
+        )
+
+    def deflate(self, horizontal: float, vertical: float) -> "Constraints":
+        """The constraints left inside padding of the given total sizes."""
+        return Constraints(
+            max(self.min_width - horizontal, 0),
+            max(self.max_width - horizontal, 0),
+            max(self.min_height - vertical, 0),
+            max(self.max_height - vertical, 0),
+        )
+
+
+def _tighten(low: float, high: float, size: float | None, fill: bool) -> tuple[float, float]:
+    """Bounds along one axis after applying a fixed size or filling the maximum."""
+    if size is not None:
+        size = min(max(size, low), high)
+        return size, size
+    if fill and high < math.inf:
+        return high, high
+    return low, high
+
+
+class _Measurement:
+    __slots__ = ("size", "placements")
+
+    def __init__(
+        self,
+        size: tuple[float, float],
+        placements: list[tuple["LayoutNode", Constraints, tuple[float, float]]],
+    ) -> None:
+        self.size = size
+        # Each child with the constraints it was measured under and its size.
+        self.placements = placements
+
+
+class LayoutNode:
+    """
+    A node laid out by its parent, stacking its children along `direction`.
+
+    After `layout`, `x` and `y` are relative to the parent and `width` and
+    `height` include the padding. A node without children takes the size
+    returned by `measure_content`.
+    """
+
+    __slots__ = (
+        "children",
+        "parent",
+        "direction",
+        "properties",
+        "intrinsic",
+        "x",
+        "y",
+        "width",
+        "height",
+        "_cache",
+        "_arranged",
+    )
+
+    def __init__(self, direction: str = VERTICAL) -> None:
+        self.children: list[LayoutNode] = []
+        self.parent: LayoutNode | None = None
+        self.direction = direction
+        self.properties = _NO_PROPERTIES
+        self.intrinsic: tuple[float, float] = (0, 0)
+        self.x: float = 0
+        self.y: float = 0
+        self.width: float = 0
+        self.height: float = 0
+        self._cache: dict[Constraints, _Measurement] | None = None
+        self._arranged: _Measurement | None = None
+
+    def set_properties(self, properties: Mapping[str, Any]) -> None:
+        if properties != self.properties:
+            self.properties = properties
+            self.invalidate()
+
+    def set_intrinsic(self, size: tuple[float, float]) -> None:
+        if size != self.intrinsic:
+            self.intrinsic = size
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached measurements of this node and its ancestors."""
+        node: LayoutNode | None = self
+        while node is not None and node._cache:
+            node._cache = None
+            node = node.parent
+
+    def measure_content(self, constraints: Constraints) -> tuple[float, float]:
+        """Size of a node without children; override for content such as wrapped text."""
+        return self.intrinsic
+
+    def measure(self, constraints: Constraints) -> tuple[float, float]:
+        return self._measurement(constraints).size
+
+    def _measurement(self, constraints: Constraints) -> _Measurement:
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = {}
+        measurement = cache.get(constraints)
+        if measurement is None:
+            if len(cache) >= _CACHE_SIZE:
+                cache.clear()
+            measurement = cache[constraints] = self._measure(constraints)
+            stats["measure"] += 1
+        return measurement
+
+    def _padding(self) -> tuple[float, float, float, float]:
+        properties = self.properties
+        return (
+            properties.get("margin_top", 0),
+            properties.get("margin_end", 0),
+            properties.get("margin_bottom", 0),
+            properties.get("margin_start", 0),
+        )
+
+    def _measure(self, constraints: Constraints) -> _Measurement:
+        properties = self.properties
+        top, end, bottom, start = self._padding()
+        inner = constraints.deflate(start + end, top + bottom)
+        min_width, max_width = _tighten(
+            inner.min_width,
+            inner.max_width,
+            properties.get("width"),
+            properties.get("hexpand", False),
+        )
+        min_height, max_height = _tighten(
+            inner.min_height,
+            inner.max_height,
+            properties.get("height"),
+            properties.get("vexpand", False),
+        )
+        inner = Constraints(min_width, max_width, min_height, max_height)
+        if self.children:
+            content, placements = self._measure_children(inner)
+        else:
+            content, placements = self.measure_content(inner), []
+        width, height = inner.constrain(*content)
+        return _Measurement(
+            constraints.constrain(width + start + end, height + top + bottom), placements
+        )
+
+    def _weight(self, horizontal: bool) -> float:
+        """Share of the free space along the parent's main axis; filling it counts as 1."""
+        properties = self.properties
+        weight = properties.get("weight")
+        if weight is not None:
+            return weight
+        return 1 if properties.get("hexpand" if horizontal else "vexpand") else 0
+
+    def _measure_children(
+        self, inner: Constraints
+    ) -> tuple[tuple[float, float], list[tuple["LayoutNode", Constraints, tuple[float, float]]]]:
+        horizontal = self.direction == HORIZONTAL
+        main_max = inner.max_width if horizontal else inner.max_height
+        cross_max = inner.max_height if horizontal else inner.max_width
+
+        def axis_constraints(low: float, high: float) -> Constraints:
+            if horizontal:
+                return Constraints(low, high, 0, cross_max)
+            return Constraints(0, cross_max, low, high)
+
+        weights = [child._weight(horizontal) for child in self.children]
+        placements: list[Any] = [None] * len(self.children)
+        used = cross = 0.0
+        for index, child in enumerate(self.children):
+            if weights[index]:
+                continue
+            child_constraints = axis_constraints(0, max(main_max - used, 0))
+            size = child.measure(child_constraints)
+            used += size[0] if horizontal else size[1]
+            cross = max(cross, size[1] if horizontal else size[0])
+            placements[index] = (child, child_constraints, size)
+
+        total = sum(weights)
+        free = max(main_max - used, 0)
+        for index, child in enumerate(self.children):
+            if not weights[index]:
+                continue
+            if free < math.inf:
+                share = free * weights[index] / total
+                child_constraints = axis_constraints(share, share)
+            else:
+                child_constraints = axis_constraints(0, math.inf)
+            size = child.measure(child_constraints)
+            used += size[0] if horizontal else size[1]
+            cross = max(cross, size[1] if horizontal else size[0])
+            placements[index] = (child, child_constraints, size)
+
+        return ((used, cross) if horizontal else (cross, used)), placements
+
+    def arrange(self, x: float, y: float, constraints: Constraints) -> None:
+        """Place this node at `x`, `y` and its subtree as measured under `constraints`."""
+        measurement = self._measurement(constraints)
+        self.x, self.y = x, y
+        if measurement is self._arranged:
+            return  # Same measurement, so the children are already in place
+        self.width, self.height = measurement.size
+        top, _, _, start = self._padding()
+        horizontal = self.direction == HORIZONTAL
+        offset = start if horizontal else top
+        for child, child_constraints, (width, height) in measurement.placements:
+            if horizontal:
+                child.arrange(offset, top, child_constraints)
+                offset += width
+            else:
+                child.arrange(start, offset, child_constraints)
+                offset += height
+        self._arranged = measurement
+        stats["arrange"] += 1
+
+    def absolute_position(self) -> tuple[float, float]:
+        x, y = self.x, self.y
+        node = self.parent
+        while node is not None:
+            x, y = x + node.x, y + node.y
+            node = node.parent
+        return x, y
+
+
+def layout(root: LayoutNode, width: float, height: float) -> None:
+    """Lay out a tree to fill a surface of the given size."""
+    root.arrange(0, 0, Constraints.tight(width, height))
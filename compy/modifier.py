@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Protocol, Self
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Mapping, Protocol, Self
+from weakref import WeakValueDictionary
 
 
 class ModifierBase[T](ABC):
@@ -11,7 +13,7 @@ class ModifierBase[T](ABC):
 
 
 class ModifierProtocol[T](Protocol):
-    def apply(self, widget: T) -> None: ...
+    def compile(self) -> Mapping[str, Any]: ...
     def padding(self, *paddings: int) -> Self:
         """
         Supports 1, 2, or 4 padding values.
@@ -29,10 +31,286 @@ class ModifierProtocol[T](Protocol):
 
     def background(self, color: str) -> Self: ...
 
-    def clickable(self, on_click: Callable[[], None]) -> Self: ...
+    def color(self, color: str) -> Self: ...
+
+    def border(self, width: int, color: str, radius: int = 0) -> Self: ...
+
+    def font(
+        self, family: str | None = None, size: int | None = None, weight: int | None = None
+    ) -> Self: ...
+
+    def clickable(self, on_click: Callable[[], Awaitable[None] | None]) -> Self: ...
 
     def fill_max_width(self) -> Self: ...
 
     def fill_max_height(self) -> Self: ...
 
     def fill_max_size(self) -> Self: ...
+
+    def weight(self, weight: float) -> Self: ...
+
+
+class ModifierElement:
+    """
+    An immutable step of a modifier chain.
+
+    Elements compare by type and field values, and contribute properties to
+    the compiled chain, where later elements override earlier ones. An
+    element can also be used on its own, as a chain of one.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def _fields(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self._fields() == other._fields()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._fields()))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        """Backend-neutral (name, value) pairs set by this element."""
+        raise NotImplementedError
+
+    def compile(self) -> Mapping[str, Any]:
+        return Modifier((self,)).compile()
+
+
+class PaddingModifier(ModifierElement):
+    __slots__ = ("padding_top", "padding_right", "padding_bottom", "padding_left")
+
+    def __init__(self, *paddings: int) -> None:
+        """
+        Supports 1, 2, or 4 padding values.
+        1 value: all paddings
+        2 values: top/bottom, left/right
+        4 values: top, right, bottom, left
+        """
+        match len(paddings):
+            case 1:
+                top = right = bottom = left = paddings[0]
+            case 2:
+                top, right = paddings
+                bottom, left = paddings
+            case 4:
+                top, right, bottom, left = paddings
+            case _:
+                raise ValueError("Padding must have 1, 2, or 4 values")
+        self.padding_top = top
+        self.padding_right = right
+        self.padding_bottom = bottom
+        self.padding_left = left
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (
+            ("margin_top", self.padding_top),
+            ("margin_end", self.padding_right),
+            ("margin_bottom", self.padding_bottom),
+            ("margin_start", self.padding_left),
+        )
+
+
+class BackgroundModifier(ModifierElement):
+    __slots__ = ("color",)
+
+    def __init__(self, color: str) -> None:
+        self.color = color
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("background", self.color),)
+
+
+class ColorModifier(ModifierElement):
+    __slots__ = ("color",)
+
+    def __init__(self, color: str) -> None:
+        self.color = color
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("color", self.color),)
+
+
+class BorderModifier(ModifierElement):
+    __slots__ = ("width", "color", "radius")
+
+    def __init__(self, width: int, color: str, radius: int = 0) -> None:
+        self.width = width
+        self.color = color
+        self.radius = radius
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("border", (self.width, self.color, self.radius)),)
+
+
+class FontModifier(ModifierElement):
+    __slots__ = ("family", "size", "weight")
+
+    def __init__(
+        self, family: str | None = None, size: int | None = None, weight: int | None = None
+    ) -> None:
+        self.family = family
+        self.size = size
+        self.weight = weight
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("font", (self.family, self.size, self.weight)),)
+
+
+class ClickableModifier(ModifierElement):
+    __slots__ = ("on_click",)
+
+    def __init__(self, on_click: Callable[[], Awaitable[None] | None]) -> None:
+        self.on_click = on_click
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("on_click", self.on_click),)
+
+
+class FillModifier(ModifierElement):
+    __slots__ = ("hexpand", "vexpand")
+
+    def __init__(self, hexpand: bool, vexpand: bool) -> None:
+        self.hexpand = hexpand
+        self.vexpand = vexpand
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return tuple(
+            (name, True)
+            for name, value in (("hexpand", self.hexpand), ("vexpand", self.vexpand))
+            if value
+        )
+
+
+class SizeModifier(ModifierElement):
+    __slots__ = ("width", "height")
+
+    def __init__(self, width: int | None, height: int | None) -> None:
+        self.width = width
+        self.height = height
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return tuple(
+            (name, value)
+            for name, value in (("width", self.width), ("height", self.height))
+            if value is not None
+        )
+
+
+class WeightModifier(ModifierElement):
+    """Share of the free space along a row or column, used by `compy.layout`."""
+
+    __slots__ = ("weight",)
+
+    def __init__(self, weight: float) -> None:
+        if weight <= 0:
+            raise ValueError("Weight must be positive")
+        self.weight = weight
+
+    def properties(self) -> tuple[tuple[str, Any], ...]:
+        return (("weight", self.weight),)
+
+
+class Modifier:
+    """
+    An immutable, interned chain of modifier elements.
+
+    Every builder method returns a new chain, and equal chains are the same
+    object, so comparing modifiers across renders is an identity check. The
+    chain compiles once into a flat mapping of properties in which the last
+    element setting a property wins; backends apply only the properties that
+    differ from what a widget already has.
+    """
+
+    __slots__ = ("elements", "_compiled", "__weakref__")
+    _interned: "WeakValueDictionary[tuple[type, tuple[ModifierElement, ...]], Modifier]" = (
+        WeakValueDictionary()
+    )
+
+    elements: tuple[ModifierElement, ...]
+    _compiled: Mapping[str, Any] | None
+
+    def __new__(cls, elements: tuple[ModifierElement, ...] = ()) -> Self:
+        key = (cls, elements)
+        modifier = cls._interned.get(key)
+        if modifier is None:
+            modifier = super().__new__(cls)
+            modifier.elements = elements
+            modifier._compiled = None
+            cls._interned[key] = modifier
+        return modifier  # type: ignore[return-value]
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or (
+            type(self) is type(other) and self.elements == other.elements  # type: ignore[attr-defined]
+        )
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.elements))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.elements!r})"
+
+    def compile(self) -> Mapping[str, Any]:
+        """Flatten the chain into its final properties, resolving overrides once."""
+        if self._compiled is None:
+            properties: dict[str, Any] = {}
+            for element in self.elements:
+                properties.update(element.properties())
+            self._compiled = MappingProxyType(properties)
+        return self._compiled
+
+    def then(self, element: ModifierElement) -> Self:
+        """Return a new chain with `element` appended."""
+        return type(self)(self.elements + (element,))
+
+    def padding(self, *paddings: int) -> Self:
+        return self.then(PaddingModifier(*paddings))
+
+    def background(self, color: str) -> Self:
+        return self.then(BackgroundModifier(color))
+
+    def color(self, color: str) -> Self:
+        return self.then(ColorModifier(color))
+
+    def border(self, width: int, color: str, radius: int = 0) -> Self:
+        return self.then(BorderModifier(width, color, radius))
+
+    def font(
+        self, family: str | None = None, size: int | None = None, weight: int | None = None
+    ) -> Self:
+        return self.then(FontModifier(family, size, weight))
+
+    def clickable(self, on_click: Callable[[], Awaitable[None] | None]) -> Self:
+        return self.then(ClickableModifier(on_click))
+
+    def fill_max_width(self) -> Self:
+        return self.then(FillModifier(hexpand=True, vexpand=False))
+
+    def fill_max_height(self) -> Self:
+        return self.then(FillModifier(hexpand=False, vexpand=True))
+
+    def fill_max_size(self) -> Self:
+        return self.then(FillModifier(hexpand=True, vexpand=True))
+
+    def size(self, width: int, height: int) -> Self:
+        return self.then(SizeModifier(width, height))
+
+    def width(self, width: int) -> Self:
+        return self.then(SizeModifier(width, None))
+
+    def height(self, height: int) -> Self:
+        return self.then(SizeModifier(None, height))
+
+    def weight(self, weight: float) -> Self:
+        return self.then(WeightModifier(weight))
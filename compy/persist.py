@@ -0,0 +1,229 @@
+"""
+Persistent states, snapshotted to disk and restored for warm starts.
+
+A snapshot is a small header (magic, format version and the app's schema
+version) followed by the zlib-compressed pickle of the registered values.
+Derived states are saved with the keys of their dependencies and restored
+without recomputing, as long as every dependency is persistent and was
+restored from the same snapshot.
+
+Snapshots are pickles: only restore files written by the app itself.
+"""
+
+import atexit
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any, Callable
+
+from compy import state as _state
+from compy.collections import MutableDictState, MutableListState, _View
+from compy.state import DerivedState, State, batch
+
+MAGIC = b"CMPY"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, format version, schema version
+
+# Errors of a missing, truncated or incompatible snapshot, which is then ignored.
+_UNREADABLE = (
+    OSError,
+    struct.error,
+    zlib.error,
+    pickle.UnpicklingError,
+    EOFError,
+    AttributeError,
+    ImportError,
+    KeyError,
+    TypeError,
+)
+
+# Derived values are saved with the keys of the states they were computed from.
+type _Derived = dict[str, tuple[Any, tuple[str, ...]]]
+
+
+class PersistentStore:
+    """
+    States registered under stable keys, saved to and restored from `path`.
+
+    Call `restore()` before the first `compose()`; states registered later
+    take their restored values as they are registered. Register derived
+    states after their dependencies, and create them with `lazy=True` so
+    they are not computed before their cached value is restored.
+
+    A snapshot with another `schema` is passed to `migrate(schema, values)`,
+    which returns the values to restore; without it, or when the file is
+    missing or unreadable, nothing is restored. Derived values are always
+    recomputed after a migration.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        schema: int = 1,
+        migrate: Callable[[int, dict[str, Any]], dict[str, Any]] | None = None,
+    ) -> None:
+        self.path = os.path.expanduser(os.fspath(path))
+        self.schema = schema
+        self.migrate = migrate
+        self._states: dict[str, State[Any]] = {}
+        self._keys: dict[State[Any], str] = {}
+        # Restored values waiting for their state to be registered.
+        self._values: dict[str, Any] = {}
+        self._derived: _Derived = {}
+        # Version of each state right after it was restored.
+        self._restored: dict[State[Any], int] = {}
+        self._lock = threading.Lock()
+
+    def register[S: State[Any]](self, key: str, state: S) -> S:
+        """Persist `state` under `key`, restoring its value if one was loaded, and return it."""
+        if key in self._states:
+            raise ValueError(f"A state is already registered as {key!r}")
+        if isinstance(state, _View):
+            raise TypeError("Collection views are rebuilt from their source; persist the source")
+        if not isinstance(state, DerivedState) and not hasattr(state, "set"):
+            raise TypeError(f"{type(state).__name__} cannot be restored")
+        self._states[key] = state
+        self._keys[state] = key
+        with batch():
+            self._apply(key, state)
+        return state
+
+    def restore(self) -> bool:
+        """Load the snapshot at `path` into the registered states; False if there was none to use."""
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+            magic, version, schema = _HEADER.unpack_from(data)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return False
+            payload = pickle.loads(zlib.decompress(data[_HEADER.size :]))
+            values: dict[str, Any] = payload["values"]
+            derived: _Derived = payload["derived"]
+        except _UNREADABLE:
+            return False
+        if schema != self.schema:
+            if self.migrate is None:
+                return False
+            values, derived = self.migrate(schema, values), {}
+        self._values, self._derived = values, derived
+        with batch():
+            for key, state in self._states.items():
+                self._apply(key, state)
+        return True
+
+    def save(self) -> bool:
+        """
+        Write a snapshot of the registered states to `path`.
+
+        Safe to call from another thread; returns False without writing if the
+        states changed while they were captured, or a batch was in progress.
+        """
+        payload = self._capture()
+        if payload is None:
+            return False
+        data = pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self.schema)
+        with self._lock:
+            _write_atomic(self.path, header + zlib.compress(data, 1))
+        return True
+
+    def save_at_exit(self) -> None:
+        """Save when the interpreter exits."""
+        atexit.register(self.save)
+
+    def autosave(self, interval: float) -> Callable[[], None]:
+        """
+        Save every `interval` seconds from a background thread, if anything changed.
+
+        Returns a function stopping the thread.
+        """
+        stopped = threading.Event()
+
+        def run() -> None:
+            saved = None
+            while not stopped.wait(interval):
+                versions = [state._version for state in list(self._states.values())]
+                if versions != saved and self.save():
+                    saved = versions
+
+        threading.Thread(target=run, name="compy-autosave", daemon=True).start()
+        return stopped.set
+
+    def _apply(self, key: str, state: State[Any]) -> None:
+        if isinstance(state, DerivedState):
+            entry = self._derived.pop(key, None)
+            if entry is not None and not state._attached:
+                self._restore_derived(state, *entry)
+        elif key in self._values:
+            state.set(self._values.pop(key))  # type: ignore[attr-defined]
+            self._restored[state] = state._version
+
+    def _restore_derived(
+        self, state: DerivedState[Any], value: Any, dependency_keys: tuple[str, ...]
+    ) -> None:
+        dependencies: dict[State[Any], int] = {}
+        for key in dependency_keys:
+            dependency = self._states.get(key)
+            if dependency is None or self._restored.get(dependency) != dependency._version:
+                return  # Not restored, or changed since: the cached value may be stale
+            dependencies[dependency] = dependency._version
+        if not state._track and dependencies.keys() != state._dependencies.keys():
+            return  # Computed from other states than when it was saved
+        state._set_dependencies(dependencies)
+        state._value = value
+        state._stale = False
+        state._version += 1
+        self._restored[state] = state._version
+
+    def _capture(self) -> dict[str, Any] | None:
+        if _state._batch_depth:
+            return None
+        states = list(self._states.items())
+        versions = [state._version for _, state in states]
+        values: dict[str, Any] = {}
+        derived: _Derived = {}
+        for key, state in states:
+            if isinstance(state, DerivedState):
+                entry = self._capture_derived(state)
+                if entry is not None:
+                    derived[key] = entry
+            elif isinstance(state, MutableListState):
+                values[key] = list(state._items)
+            elif isinstance(state, MutableDictState):
+                values[key] = dict(state._items)
+            else:
+                values[key] = state._value
+        if _state._batch_depth or versions != [state._version for _, state in states]:
+            return None  # Changed while capturing
+        return {"values": values, "derived": derived}
+
+    def _capture_derived(self, state: DerivedState[Any]) -> tuple[Any, tuple[str, ...]] | None:
+        """The value of `state` and its dependencies' keys, if it is up to date and they persist."""
+        if state._stale or state._queued:
+            return None
+        value = state._value
+        keys = []
+        for dependency, version in dict(state._dependencies).items():
+            key = self._keys.get(dependency)
+            if key is None or dependency._version != version:
+                return None
+            keys.append(key)
+        return value, tuple(keys)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replace the file at `path`, so a crash never leaves a partial snapshot."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".compy-")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+from typing import Protocol
+
+from compy import debug, trace
+
+
+class Flushable(Protocol):
+    def flush(self) -> None:
+        """Apply the updates queued since the last flush."""
+
+
+class Scheduler(ABC):
+    """
+    Coalesces composable updates and applies them once per frame.
+
+    While a scheduler is installed, state changes only mark composables dirty;
+    `flush()` then gives each dirty composable a single update with the latest
+    props and content.
+    """
+
+    def __init__(self) -> None:
+        self._dirty: dict[Flushable, None] = {}
+        self._requested = False
+
+    def schedule(self, composable: Flushable) -> None:
+        self._dirty[composable] = None
+        if not self._requested:
+            self._requested = True
+            self.request_flush()
+
+    @abstractmethod
+    def request_flush(self) -> None:
+        """Arrange for `flush()` to be called before the next frame is drawn."""
+
+    def flush(self) -> None:
+        self._requested = False
+        tracer = trace.active
+        if tracer is not None:
+            tracer.begin_frame()
+        try:
+            while self._dirty:
+                dirty = list(self._dirty)
+                self._dirty.clear()
+                for composable in dirty:
+                    composable.flush()
+        finally:
+            if tracer is not None:
+                tracer.end_frame()
+            if debug.active is not None:
+                debug.active.settle()
+
+
+class ManualScheduler(Scheduler):
+    """Scheduler flushed explicitly by calling `flush()`, e.g. from tests."""
+
+    def request_flush(self) -> None:
+        pass
+
+
+_scheduler: Scheduler | None = None
+
+
+def set_scheduler(scheduler: Scheduler | None) -> None:
+    """Install the scheduler used by all composables, or None to update immediately."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler() -> Scheduler | None:
+    return _scheduler
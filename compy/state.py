@@ -1,49 +1,437 @@
-from typing import Any, Callable
+import threading
+import weakref
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from itertools import count
+from types import MethodType
+from typing import Any, Callable, Iterator
+
+from compy import debug, trace
+from compy.equality import Equality, structural
+
+# Changes are propagated in two phases when the outermost batch exits: derived
+# states are recomputed in height order, then observers of every changed state
+# are called once. Observers therefore never see a partially updated graph.
+_batch_depth = 0
+_dirty: list[tuple[int, int, "DerivedState[Any]"]] = []
+_changed: dict["State[Any]", None] = {}
+_sequence = count()
+# States read by the computation currently being evaluated, if it is tracked.
+_reads: dict["State[Any]", None] | None = None
+# Writes from other threads are queued and applied on the main thread, keeping
+# only the latest value per state until the queue is flushed.
+_dispatch: Callable[[Callable[[], Any]], Any] | None = None
+_main_thread_id = threading.main_thread().ident
+_writes: dict["MutableState[Any]", Any] = {}
+_writes_lock = threading.Lock()
 
 
 class State[T]:
-    def __init__(self, initial: T):
+    """
+    A value observed by subscribers and derived states.
+
+    `equal` decides whether a new value is a change worth notifying; see
+    `compy.equality` for the policies.
+    """
+
+    __slots__ = (
+        "_value",
+        "_height",
+        "_version",
+        "_equal",
+        "observers",
+        "_dependents",
+        "__weakref__",
+    )
+
+    def __init__(self, initial: T, *, equal: Equality = structural):
         self._value = initial
+        self._equal = equal
+        self._height = 0
+        self._version = 0
         self.observers: list[Callable[[T], None]] = []
+        self._dependents: dict["DerivedState[Any]", None] = {}
 
     def get(self) -> T:
+        if _reads is not None:
+            _reads[self] = None
         return self._value
 
-    def subscribe(self, observer: Callable[[T], None]) -> None:
+    def subscribe(self, observer: Callable[[T], None], *, weak: bool = False) -> "Subscription":
+        """
+        Call `observer` with the current value now and on every change.
+
+        With `weak=True` the state only holds a weak reference to the observer
+        (or to the object of a bound method), and the subscription ends when
+        it is garbage collected.
+        """
+        if weak:
+            observer = _WeakObserver(self, observer)
         self.observers.append(observer)
-        observer(self.get())  # Immediately call the observer with the current value
+        with untracked():
+            observer(self.get())  # Immediately call the observer with the current value
+        return Subscription(self, observer)
+
+    def unsubscribe(self, observer: Callable[[T], None]) -> None:
+        try:
+            self.observers.remove(observer)
+        except ValueError:
+            pass
 
     def _notify(self) -> None:
-        for observer in self.observers:
-            observer(self.get())
+        _mark_changed(self)
+        if _batch_depth == 0:
+            _flush()
 
 
 class MutableState[T](State[T]):
+    __slots__ = ()
+
     def set(self, value: T) -> None:
-        if value != self._value:
+        if _dispatch is not None and threading.get_ident() != _main_thread_id:
+            _queue_write(self, value)
+            return
+        if not self._equal(self._value, value):
             self._value = value
+            if debug.active is not None:
+                debug.active.write(self)
             self._notify()
 
 
-def derived[T](compute: Callable[[], T], *dependencies: State) -> State[T]:
-    state = State(compute())
+class DerivedState[T](State[T]):
+    """
+    A state computed from other states, recomputed at most once per change.
+
+    With `track=True` the dependencies are the states read by the last
+    evaluation of `compute`, so they follow the branches actually taken.
+
+    With `lazy=True` nothing is computed until the value is read. A lazy state,
+    or any state whose last observer has unsubscribed, is detached from its
+    dependencies and only recomputes on `get()` if one of them has changed.
+    """
+
+    __slots__ = ("_compute", "_track", "_attached", "_stale", "_queued", "_dependencies")
+
+    def __init__(
+        self,
+        compute: Callable[[], T],
+        dependencies: tuple[State[Any], ...] = (),
+        *,
+        track: bool = False,
+        lazy: bool = False,
+        equal: Equality = structural,
+    ):
+        super().__init__(None, equal=equal)  # type: ignore[arg-type]
+        self._compute = compute
+        self._track = track
+        self._attached = False
+        self._stale = True
+        self._queued = False
+        # Each dependency maps to the version it had when last evaluated.
+        self._dependencies: dict[State[Any], int] = dict.fromkeys(dependencies, -1)
+        if not lazy:
+            self._attach()
+
+    def get(self) -> T:
+        if not self._attached:
+            self._refresh()
+        return super().get()
+
+    def subscribe(self, observer: Callable[[T], None], *, weak: bool = False) -> "Subscription":
+        self._attach()
+        return super().subscribe(observer, weak=weak)
+
+    def unsubscribe(self, observer: Callable[[T], None]) -> None:
+        super().unsubscribe(observer)
+        self._detach()
+
+    def _evaluate(self) -> T:
+        global _reads
+        previous = _reads
+        _reads = {} if self._track else None
+        try:
+            return self._compute()
+        finally:
+            reads = _reads if self._track else self._dependencies
+            _reads = previous
+            reads.pop(self, None)
+            self._set_dependencies({dep: dep._version for dep in reads})
+            self._stale = False
+
+    def _set_dependencies(self, dependencies: dict[State[Any], int]) -> None:
+        if self._attached:
+            for stale in self._dependencies.keys() - dependencies.keys():
+                _unlink(stale, self)
+            for dependency in dependencies.keys() - self._dependencies.keys():
+                _link(dependency, self)
+        self._dependencies = dependencies
+        self._raise_height(1 + max((dep._height for dep in dependencies), default=0))
+
+    def _raise_height(self, height: int) -> None:
+        if height > self._height:
+            self._height = height
+            for dependent in self._dependents:
+                dependent._raise_height(height + 1)
+
+    def _is_outdated(self) -> bool:
+        for dependency, version in self._dependencies.items():
+            if isinstance(dependency, DerivedState) and not dependency._attached:
+                dependency._refresh()
+            if dependency._version != version:
+                return True
+        return self._stale
+
+    def _refresh(self) -> None:
+        """Bring the value up to date without notifying observers."""
+        if self._is_outdated():
+            new_value = self._evaluate()
+            if not self._equal(self._value, new_value):
+                self._value = new_value
+                self._version += 1
+
+    def _attach(self) -> None:
+        if self._attached:
+            return
+        self._attached = True
+        for dependency in self._dependencies:
+            _link(dependency, self)
+        try:
+            self._refresh()
+        except BaseException:
+            # Nothing observes it after all: let go of what the failed evaluation read.
+            self._attached = False
+            self._stale = True
+            for dependency in self._dependencies:
+                _unlink(dependency, self)
+            raise
+
+    def _detach(self) -> None:
+        # Unobserved nodes let go of their dependencies, so they can be collected
+        # along with whatever observed them; get() pulls them up to date again.
+        if not self._attached or self.observers or self._dependents:
+            return
+        self._attached = False
+        for dependency in self._dependencies:
+            _unlink(dependency, self)
+
+    def _recompute(self) -> None:
+        new_value = self._evaluate()
+        if any(isinstance(dep, DerivedState) and dep._queued for dep in self._dependencies):
+            # A newly read dependency has not settled yet; evaluate again after it.
+            _queue(self)
+            return
+        if not self._equal(self._value, new_value):
+            self._value = new_value
+            _mark_changed(self)
+        elif debug.active is not None:
+            debug.active.record(debug.UNCHANGED_DERIVED, trace.label(self))
+
+
+class Subscription:
+    """Handle returned by `State.subscribe`; `dispose()` ends the subscription."""
+
+    __slots__ = ("_state", "_observer")
+
+    def __init__(self, state: State[Any], observer: Callable[[Any], None]):
+        self._state: State[Any] | None = state
+        self._observer = observer
+
+    def dispose(self) -> None:
+        if self._state is not None:
+            self._state.unsubscribe(self._observer)
+            self._state = None
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.dispose()
+
+
+class _WeakObserver:
+    def __init__(self, state: State[Any], observer: Callable[[Any], None]):
+        def release(_: Any) -> None:
+            state.unsubscribe(self)
+
+        self._ref = (weakref.WeakMethod if isinstance(observer, MethodType) else weakref.ref)(
+            observer, release
+        )
+
+    def __call__(self, value: Any) -> None:
+        observer = self._ref()
+        if observer is not None:
+            observer(value)
+
+
+def _link(dependency: State[Any], dependent: DerivedState[Any]) -> None:
+    if isinstance(dependency, DerivedState):
+        dependency._attach()
+    dependency._dependents[dependent] = None
+
+
+def _unlink(dependency: State[Any], dependent: DerivedState[Any]) -> None:
+    del dependency._dependents[dependent]
+    if isinstance(dependency, DerivedState):
+        dependency._detach()
+
+
+def _mark_changed(state: State[Any]) -> None:
+    state._version += 1
+    _changed[state] = None
+    if trace.active is not None:
+        trace.active.notify(state, len(state._dependents) + len(state.observers))
+    for dependent in state._dependents:
+        _queue(dependent)
+
+
+def _queue(node: DerivedState[Any]) -> None:
+    if not node._queued:
+        node._queued = True
+        heappush(_dirty, (node._height, next(_sequence), node))
+
+
+def _flush() -> None:
+    """Propagate pending changes through the graph, then notify observers."""
+    global _batch_depth
+    _batch_depth += 1
+    tracer = trace.active
+    if tracer is not None:
+        tracer.begin_frame()
+    try:
+        while _dirty or _changed:
+            while _dirty:
+                height, _, node = heappop(_dirty)
+                if height != node._height:
+                    # Re-tracking raised the node above where it was queued.
+                    heappush(_dirty, (node._height, next(_sequence), node))
+                    continue
+                node._queued = False
+                if tracer is None:
+                    node._recompute()
+                else:
+                    tracer.call("derive", trace.label(node), node._recompute)
+
+            observers: dict[Callable[[Any], None], State[Any]] = {}
+            for state in _changed:
+                for observer in state.observers:
+                    observers[observer] = state
+            _changed.clear()
+            for observer, state in observers.items():
+                observer(state.get())
+    finally:
+        _batch_depth -= 1
+        if tracer is not None:
+            tracer.end_frame()
+        if _batch_depth == 0 and debug.active is not None:
+            debug.active.settle()
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """
+    Defer state notifications until the outermost batch exits.
+
+    Can be used as a context manager or as a decorator. Each observer of the
+    states changed inside the batch is called exactly once with the latest value.
+    """
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if _batch_depth == 0:
+            _flush()
+
+
+def set_dispatcher(dispatch: Callable[[Callable[[], Any]], Any] | None) -> None:
+    """
+    Make `MutableState.set` safe to call from any thread.
+
+    `dispatch` must run a callback on the calling (main) thread later, like
+    `GLib.idle_add`. Writes from other threads are then queued, repeated writes
+    to a state collapse to the latest value, and a single dispatched flush
+    applies them all in one batch. `None` restores direct writes.
+    """
+    global _dispatch, _main_thread_id
+    _dispatch = dispatch
+    _main_thread_id = threading.get_ident()
+
+
+def _queue_write(state: "MutableState[Any]", value: Any) -> None:
+    with _writes_lock:
+        scheduled = bool(_writes)
+        _writes[state] = value
+    if not scheduled:
+        _dispatch(_apply_writes)
+
+
+def _apply_writes() -> None:
+    with _writes_lock:
+        writes = list(_writes.items())
+        _writes.clear()
+    with batch():
+        for state, value in writes:
+            state.set(value)
+
+
+@contextmanager
+def untracked() -> Iterator[None]:
+    """Read states without recording them as dependencies of the current computation."""
+    global _reads
+    previous = _reads
+    _reads = None
+    try:
+        yield
+    finally:
+        _reads = previous
+
+
+def capture_reads[T](compute: Callable[[], T]) -> tuple[T, dict[State[Any], int]]:
+    """
+    Run `compute` and return its result with the versions of the states it read.
+
+    The reads are still recorded as dependencies of the enclosing computation.
+    """
+    global _reads
+    previous = _reads
+    _reads = {}
+    try:
+        value = compute()
+    finally:
+        reads, _reads = _reads, previous
+        if previous is not None:
+            previous.update(reads)
+    return value, {state: state._version for state in reads}
+
+
+def reads_changed(reads: dict[State[Any], int]) -> bool:
+    """Whether any state captured by `capture_reads` changed since."""
+    for state, version in reads.items():
+        if isinstance(state, DerivedState) and not state._attached:
+            state._refresh()
+        if state._version != version:
+            return True
+    return False
+
 
-    def update(_: Any) -> None:
-        new_value = compute()
-        if new_value != state._value:
-            state._value = new_value
-            state._notify()
+def replay_reads(reads: dict[State[Any], int]) -> None:
+    """Record states captured by `capture_reads` as read by the current computation."""
+    if _reads is not None:
+        _reads.update(dict.fromkeys(reads))
 
-    for dependency in dependencies:
-        dependency.subscribe(update)
 
-    return state
+def derived[T](
+    compute: Callable[[], T],
+    *dependencies: State,
+    lazy: bool = False,
+    equal: Equality = structural,
+) -> State[T]:
+    return DerivedState(compute, dependencies, lazy=lazy, equal=equal)
 
 
-def auto_derived[T](compute: Callable[[], T]) -> State[T]:
-    dependencies = [
-        var.cell_contents
-        for var in (compute.__closure__ or [])
-        if isinstance(var.cell_contents, State)
-    ]
-    return derived(compute, *dependencies)
+def auto_derived[T](
+    compute: Callable[[], T], *, lazy: bool = False, equal: Equality = structural
+) -> State[T]:
+    """Derive a state from whichever states `compute` reads while it runs."""
+    return DerivedState(compute, track=True, lazy=lazy, equal=equal)
@@ -0,0 +1,201 @@
+"""
+Optional instrumentation of composition and state propagation.
+
+Nothing is recorded unless a `Tracer` is installed with `set_tracer`; until
+then the instrumented code paths only check `active` for None.
+"""
+
+import os
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import IO, Any, Callable, Iterator
+from weakref import WeakKeyDictionary
+
+# The installed tracer, read directly by the instrumented code paths.
+active: "Tracer | None" = None
+_names: WeakKeyDictionary[Any, str] = WeakKeyDictionary()
+
+
+def set_tracer(tracer: "Tracer | None") -> None:
+    """Install the tracer recording all compositions and state changes, or None to stop."""
+    global active
+    active = tracer
+
+
+def name[S](state: S, label: str) -> S:
+    """Give a state a readable label in traces and reports, and return it."""
+    _names[state] = label
+    return state
+
+
+def label(state: Any) -> str:
+    """The label of a state: its `name`, the function computing it, or its type and id."""
+    named = _names.get(state)
+    if named is not None:
+        return named
+    compute = getattr(state, "_compute", None)
+    if compute is not None:
+        return f"{type(state).__name__}({getattr(compute, '__qualname__', compute)})"
+    return f"{type(state).__name__}@{id(state):x}"
+
+
+class FrameSummary:
+    """Where the time of one frame went."""
+
+    def __init__(self, index: int, start: int) -> None:
+        self.index = index
+        self.start = start
+        self.duration = 0
+        # Nanoseconds spent in each (category, name), excluding nested spans.
+        self.times: Counter[tuple[str, str]] = Counter()
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self.notifications: Counter[str] = Counter()
+        self.fanout: Counter[str] = Counter()
+
+    def slowest(self, count: int = 5) -> list[tuple[tuple[str, str], int]]:
+        return self.times.most_common(count)
+
+    def most_notified(self, count: int = 5) -> list[tuple[str, int]]:
+        return self.notifications.most_common(count)
+
+    def widest_fanout(self, count: int = 5) -> list[tuple[str, int]]:
+        return self.fanout.most_common(count)
+
+    def __str__(self) -> str:
+        lines = [f"frame {self.index}: {self.duration / 1e6:.2f} ms"]
+        lines.extend(
+            f"  {category} {name}: {time / 1e6:.2f} ms ({self.calls[category, name]}x)"
+            for (category, name), time in self.slowest()
+        )
+        lines.extend(
+            f"  notified {state}: {count}x, fan-out {self.fanout[state]}"
+            for state, count in self.most_notified()
+        )
+        return "\n".join(lines)
+
+
+class Tracer:
+    """
+    Records spans and counters for composables and states.
+
+    Spans are kept in a bounded buffer for `export_chrome_trace`, and every
+    frame (a scheduler flush, a state propagation or a `frame()` block) is
+    summarized into `frames` and passed to `on_frame`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_events: int = 100_000,
+        max_frames: int = 120,
+        on_frame: Callable[[FrameSummary], None] | None = None,
+    ) -> None:
+        self.events: deque[tuple[str, str, int, int]] = deque(maxlen=max_events)
+        self.frames: deque[FrameSummary] = deque(maxlen=max_frames)
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self.notifications: Counter[str] = Counter()
+        self.on_frame = on_frame
+        self._origin = perf_counter_ns()
+        self._stack: list[list[int]] = []  # [start, time spent in nested spans]
+        self._frame: FrameSummary | None = None
+        self._frame_depth = 0
+        self._frame_count = 0
+
+    def begin(self) -> None:
+        """Start a span, ended by the matching `end`."""
+        self._stack.append([perf_counter_ns(), 0])
+
+    def end(self, category: str, name: str) -> None:
+        start, nested = self._stack.pop()
+        duration = perf_counter_ns() - start
+        if self._stack:
+            self._stack[-1][1] += duration
+        self.events.append((category, name, start, duration))
+        key = (category, name)
+        self.calls[key] += 1
+        frame = self._frame
+        if frame is not None:
+            frame.times[key] += duration - nested
+            frame.calls[key] += 1
+
+    def call[R](self, category: str, name: str, func: Callable[..., R], *args: Any) -> R:
+        """Call `func(*args)` inside a span."""
+        self.begin()
+        try:
+            return func(*args)
+        finally:
+            self.end(category, name)
+
+    def notify(self, state: Any, fanout: int) -> None:
+        """Count a change of `state` reaching `fanout` observers and dependents."""
+        state_label = label(state)
+        self.notifications[state_label] += 1
+        # A change made outside of a frame opens one, closed by the propagation it causes.
+        frame = self._frame or self._open_frame()
+        frame.notifications[state_label] += 1
+        frame.fanout[state_label] = max(frame.fanout[state_label], fanout)
+
+    def begin_frame(self) -> None:
+        if self._frame is None:
+            self._open_frame()
+        self._frame_depth += 1
+
+    def _open_frame(self) -> FrameSummary:
+        self._frame = FrameSummary(self._frame_count, perf_counter_ns())
+        self._frame_count += 1
+        return self._frame
+
+    def end_frame(self) -> None:
+        self._frame_depth -= 1
+        if self._frame_depth > 0 or self._frame is None:
+            return
+        frame, self._frame = self._frame, None
+        frame.duration = perf_counter_ns() - frame.start
+        self.events.append(("frame", f"frame {frame.index}", frame.start, frame.duration))
+        self.frames.append(frame)
+        if self.on_frame is not None:
+            self.on_frame(frame)
+
+    @contextmanager
+    def frame(self) -> Iterator[None]:
+        """Summarize the work done inside the block as one frame."""
+        self.begin_frame()
+        try:
+            yield
+        finally:
+            self.end_frame()
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """The recorded spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for category, name, start, duration in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file: str | IO[str]) -> None:
+        """Write `chrome_trace()` as JSON to a path or text file."""
+        import json
+
+        if isinstance(file, str):
+            with open(file, "w") as f:
+                json.dump(self.chrome_trace(), f)
+        else:
+            json.dump(self.chrome_trace(), file)
+
+    def reset(self) -> None:
+        self.events.clear()
+        self.frames.clear()
+        self.calls.clear()
+        self.notifications.clear()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Collection
 
 from compy.modifier import ModifierProtocol
 
@@ -10,8 +10,15 @@ class Widget[T](ABC):
         """Create a new instance of the widget."""
 
     @abstractmethod
-    def update(self, instance: T, props: dict[str, Any]) -> None:
-        """Update the properties of the widget instance."""
+    def update(
+        self, instance: T, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        """
+        Update the properties of the widget instance.
+
+        `changed` holds the keys that differ from the previous update, so only
+        those need to be applied. `None` means every property must be applied.
+        """
 
     @abstractmethod
     def set_content(self, instance: T, content: list[Any]) -> None:
@@ -21,82 +28,113 @@ class Widget[T](ABC):
     def apply_modifier(self, instance: T, modifier: ModifierProtocol) -> None:
         """Apply a modifier to the widget instance."""
 
+    @abstractmethod
+    def insert_child_after(self, instance: T, child: Any, sibling: Any | None) -> None:
+        """
+        Insert a child after `sibling`, or first when `sibling` is None.
+
+        A child that is already in the widget instance is moved instead.
+        """
+
+    @abstractmethod
+    def remove_child(self, instance: T, child: Any) -> None:
+        """Remove a child from the widget instance."""
+
+    def dispose(self, instance: T) -> None:
+        """Release resources held by a widget instance that is no longer used."""
+
     def render(self, instance: T) -> str:
         """Render the widget instance to a string for debugging."""
         return f"{instance}"
 
 
-class TextWidget(Widget[Any]):
-    def create(self) -> str:
-        return ""
-
-    def update(self, instance: str, props: dict[str, Any]) -> None:
-        return props["text"]
-
-    def render(self, instance: str) -> str:
-        return f"Text({instance})"
+class DictWidget(Widget[dict]):
+    """Reference implementation keeping the widget state in a plain dict."""
 
+    kind = "widget"
 
-class ButtonWidget(Widget[Any]):
     def create(self) -> dict:
-        return {"type": "button", "content": []}
+        return {"type": self.kind, "content": []}
 
-    def update(self, instance: dict, props: dict[str, Any]) -> None:
-        return props["text"]
+    def update(
+        self, instance: dict, props: dict[str, Any], changed: Collection[str] | None = None
+    ) -> None:
+        instance.update(props)
 
     def set_content(self, instance: dict, content: list[Any]) -> None:
-        assert len(content) == 1, "Button can only have one child"
-        instance["content"] = content
+        instance["content"] = list(content)
 
-    def render(self, instance: dict) -> str:
-        child_text = instance["content"][0].render() if instance["content"] else ""
-        return f"Button({child_text})"
+    def apply_modifier(self, instance: dict, modifier: ModifierProtocol) -> None:
+        instance["modifier"] = modifier
 
+    def insert_child_after(self, instance: dict, child: Any, sibling: Any | None) -> None:
+        content = [item for item in instance["content"] if item is not child]
+        index = 0 if sibling is None else next(i for i, c in enumerate(content) if c is sibling) + 1
+        content.insert(index, child)
+        instance["content"] = content
 
-class BoxWidget(Widget[Any]):
-    def create(self) -> dict:
-        return {"type": "box", "orientation": "vertical", "content": []}
+    def remove_child(self, instance: dict, child: Any) -> None:
+        instance["content"] = [item for item in instance["content"] if item is not child]
 
-    def update(self, instance: dict, props: dict[str, Any]) -> None:
-        instance.update(props)
+
+class TextWidget(DictWidget):
+    kind = "text"
 
     def set_content(self, instance: dict, content: list[Any]) -> None:
-        instance["content"] = content
+        raise ValueError("Text widget cannot set content")
 
-    def render(self, instance: dict) -> str:
-        orientation = instance["orientation"]
-        children = instance["content"]
-        if orientation == "vertical":
-            return "\n".join(child.render() for child in children)
-        else:
-            return " ".join(child.render() for child in children)
+    def insert_child_after(self, instance: dict, child: Any, sibling: Any | None) -> None:
+        raise ValueError("Text widget cannot set content")
 
+    def remove_child(self, instance: dict, child: Any) -> None:
+        raise ValueError("Text widget cannot set content")
 
-class RowWidget(Widget[Any]):
-    def create(self) -> dict:
-        return {"type": "row", "content": []}
+    def render(self, instance: dict) -> str:
+        return f"Text({instance.get('text', '')})"
 
-    def update(self, instance: dict, props: dict[str, Any]) -> None:
-        instance.update(props)
+
+class ButtonWidget(DictWidget):
+    kind = "button"
 
     def set_content(self, instance: dict, content: list[Any]) -> None:
-        instance["content"] = content
+        assert len(content) == 1, "Button can only have one child"
+        instance["content"] = list(content)
 
-    def render(self, instance: dict) -> str:
-        children = instance["content"]
-        return " ".join(child.render() for child in children)
 
+class BoxWidget(DictWidget):
+    kind = "box"
 
-class ColumnWidget(Widget[Any]):
     def create(self) -> dict:
-        return {"type": "column", "content": []}
+        return {"type": self.kind, "orientation": "vertical", "content": []}
+
+
+class RowWidget(DictWidget):
+    kind = "row"
+
+
+class ColumnWidget(DictWidget):
+    kind = "column"
 
-    def update(self, instance: dict, props: dict[str, Any]) -> None:
-        instance.update(props)
+
+class LazyColumnWidget(DictWidget):
+    """A vertical list that only composes the rows currently visible."""
+
+    kind = "lazy_column"
+
+    def create(self) -> dict:
+        return {"type": self.kind, "items": [], "item": None}
 
     def set_content(self, instance: dict, content: list[Any]) -> None:
-        instance["content"] = content
+        raise ValueError("Lazy lists compose their rows from items")
 
-    def render(self, instance: dict) -> str:
-        children = instance["content"]
-        return "\n".join(child.render() for child in children)
+    def insert_child_after(self, instance: dict, child: Any, sibling: Any | None) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+    def remove_child(self, instance: dict, child: Any) -> None:
+        raise ValueError("Lazy lists compose their rows from items")
+
+
+class LazyRowWidget(LazyColumnWidget):
+    """A horizontal list that only composes the items currently visible."""
+
+    kind = "lazy_row"
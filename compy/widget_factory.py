@@ -1,27 +1,87 @@
+from importlib import import_module
 from typing import Callable
 
 from compy.widget import Widget
 
+type Implementations = dict[type[Widget], type[Widget]]
+
+# Built-in backends, as "module:attribute" paths to their implementations.
+BACKENDS: dict[str, str | Callable[[], Implementations]] = {
+    "gtk": "compy.gtk:GTK_IMPLEMENTATIONS",
+    "headless": "compy.headless:HEADLESS_IMPLEMENTATIONS",
+}
+
 
 class WidgetFactory:
+    """
+    Resolves widget classes to the adapters of the loaded backend.
+
+    Adapters are stateless, so one shared instance per widget class is created
+    on first use. A class without an implementation of its own uses the one of
+    its nearest base class in the MRO, or itself when there is none.
+
+    A backend selected with `use_backend` is only imported when the first
+    adapter is needed, so importing an app does not load its toolkit.
+    """
+
     def __init__(self) -> None:
-        self.implementations: dict[type[Widget], type[Widget]] = {}
+        self.implementations: Implementations = {}
+        self.backends = dict(BACKENDS)
+        self._adapters: dict[type[Widget], Widget] = {}
+        self._pending: str | None = None
 
     def register(self, widget_class: type[Widget]) -> Callable[[type[Widget]], type[Widget]]:
         def decorator(impl: type[Widget]) -> type[Widget]:
             self.implementations[widget_class] = impl
+            self._adapters.clear()
             return impl
 
         return decorator
 
-    def load_implementations(self, implementations: dict[type[Widget], type[Widget]]) -> None:
+    def register_backend(
+        self, name: str, implementations: str | Callable[[], Implementations]
+    ) -> None:
+        """
+        Make a backend available to `use_backend` under `name`.
+
+        `implementations` is a "module:attribute" path or a function returning
+        the implementations, so registering a backend does not import it.
+        """
+        self.backends[name] = implementations
+
+    def use_backend(self, name: str) -> None:
+        """Select a registered backend, loaded when the first widget is created."""
+        if name not in self.backends:
+            raise ValueError(f"Unknown backend {name!r}; registered: {', '.join(self.backends)}")
+        self._pending = name
+        self._adapters.clear()
+
+    def load_implementations(self, implementations: Implementations) -> None:
         self.implementations.update(implementations)
+        self._adapters.clear()
+
+    def _load_backend(self, name: str) -> None:
+        self._pending = None
+        source = self.backends[name]
+        if isinstance(source, str):
+            module, _, attribute = source.partition(":")
+            implementations = getattr(import_module(module), attribute)
+        else:
+            implementations = source()
+        self.load_implementations(implementations)
 
     def create(self, widget_class: type[Widget]) -> Widget:
-        impl = self.implementations.get(widget_class)
-        if not impl:
+        adapter = self._adapters.get(widget_class)
+        if adapter is None:
+            if self._pending is not None:
+                self._load_backend(self._pending)
             impl = widget_class  # Default to the base class
-        return impl()
+            for cls in widget_class.__mro__:
+                if cls in self.implementations:
+                    impl = self.implementations[cls]
+                    break
+            adapter = self._adapters[widget_class] = impl()
+        return adapter
 
 
 # Global widget factory instance
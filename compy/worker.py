@@ -0,0 +1,139 @@
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from compy import state as _state
+from compy.state import MutableState, State, batch, untracked
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="compy-worker")
+    return _executor
+
+
+def run_in_thread[T](
+    state: MutableState[T],
+    func: Callable[..., T],
+    *args: Any,
+    executor: ThreadPoolExecutor | None = None,
+) -> Future[T]:
+    """
+    Run `func(*args)` on a worker thread and publish its result into `state`.
+
+    The write goes through the thread-safe path of `MutableState.set`, so it
+    lands on the main thread once a dispatcher is installed. Exceptions are
+    left on the returned future.
+    """
+    future = (executor or _default_executor()).submit(func, *args)
+
+    def publish(done: Future[T]) -> None:
+        if not done.cancelled() and done.exception() is None:
+            state.set(done.result())
+
+    future.add_done_callback(publish)
+    return future
+
+
+_process_executor: ProcessPoolExecutor | None = None
+
+
+def _default_process_executor() -> ProcessPoolExecutor:
+    global _process_executor
+    if _process_executor is None:
+        _process_executor = ProcessPoolExecutor()
+    return _process_executor
+
+
+class ProcessDerived[T]:
+    """
+    A derived value computed in a process pool from a snapshot of its inputs.
+
+    `compute` receives the values of the dependencies as positional arguments,
+    so it must be picklable, e.g. a module-level function. `status` is
+    "loading", "ready" or "error"; `value` holds the latest result and `error`
+    the exception of the latest failed run. Results of runs superseded by newer
+    inputs are cancelled when possible and dropped otherwise.
+
+    Results are published on the main thread, so a dispatcher must be
+    installed (`GtkApp.run` or `compy.state.set_dispatcher`).
+    """
+
+    def __init__(
+        self,
+        compute: Callable[..., T],
+        dependencies: tuple[State[Any], ...],
+        executor: Executor | None = None,
+        initial: T | None = None,
+    ):
+        if _state._dispatch is None:
+            raise RuntimeError("process_derived needs a dispatcher to publish on the main thread")
+        self.status: MutableState[str] = MutableState("loading")
+        self.value: MutableState[T | None] = MutableState(initial)
+        self.error: MutableState[BaseException | None] = MutableState(None)
+        self._compute = compute
+        self._dependencies = dependencies
+        self._executor = executor or _default_process_executor()
+        self._generation = 0
+        self._future: Future[T] | None = None
+        self._started = False
+        self._subscriptions = [dep.subscribe(self._on_change) for dep in dependencies]
+        self._started = True
+        self._submit()
+
+    def _on_change(self, _: Any) -> None:
+        if self._started:
+            self._submit()
+
+    def _submit(self) -> None:
+        with untracked():
+            inputs = [dependency.get() for dependency in self._dependencies]
+        if self._future is not None:
+            self._future.cancel()
+        self._generation += 1
+        generation = self._generation
+        self.status.set("loading")
+        self._future = self._executor.submit(self._compute, *inputs)
+        self._future.add_done_callback(lambda done: self._publish(generation, done))
+
+    def _publish(self, generation: int, done: Future[T]) -> None:
+        """Apply the result of a run on the main thread, where runs are submitted."""
+        if threading.get_ident() == _state._main_thread_id:
+            self._apply(generation, done)
+        elif _state._dispatch is not None:
+            _state._dispatch(lambda: self._apply(generation, done))
+
+    def _apply(self, generation: int, done: Future[T]) -> None:
+        if generation != self._generation or done.cancelled():
+            return  # Superseded by a newer run, or disposed
+        error = done.exception()
+        with batch():
+            if error is not None:
+                self.error.set(error)
+                self.status.set("error")
+            else:
+                self.value.set(done.result())
+                self.error.set(None)
+                self.status.set("ready")
+
+    def dispose(self) -> None:
+        """Stop following the dependencies and cancel the pending run."""
+        for subscription in self._subscriptions:
+            subscription.dispose()
+        self._subscriptions.clear()
+        self._generation += 1
+        if self._future is not None:
+            self._future.cancel()
+
+
+def process_derived[T](
+    compute: Callable[..., T],
+    *dependencies: State[Any],
+    executor: Executor | None = None,
+    initial: T | None = None,
+) -> ProcessDerived[T]:
+    """Derive a value in a process pool; see `ProcessDerived`."""
+    return ProcessDerived(compute, dependencies, executor, initial)
@@ -1,11 +1,10 @@
 from compy.composable import Button, Column, Composable, Row, Text
-from compy.gtk import GTK_IMPLEMENTATIONS
 from compy.gtk.core import GtkApp
 from compy.gtk.modifier import Modifier
 from compy.state import MutableState, auto_derived
 from compy.widget_factory import widget_factory
 
-widget_factory.load_implementations(GTK_IMPLEMENTATIONS)
+widget_factory.use_backend("gtk")
 
 
 def Counter(count: MutableState[int], step: MutableState[int]) -> Composable:
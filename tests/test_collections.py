@@ -0,0 +1,192 @@
+import random
+import threading
+import unittest
+
+from compy import state as _state
+from compy.collections import (
+    MISSING,
+    DictChange,
+    ListMove,
+    ListSplice,
+    MutableDictState,
+    MutableListState,
+)
+from compy.state import set_dispatcher
+
+
+def replay(records: list, items: list) -> None:
+    """Apply list change records to `items`."""
+    for change in records:
+        if isinstance(change, ListMove):
+            items.insert(change.target, items.pop(change.source))
+        else:
+            items[change.index : change.index + len(change.removed)] = change.added
+
+
+class MutableListStateTest(unittest.TestCase):
+    def test_operations(self) -> None:
+        items = MutableListState([1, 2, 3])
+        items.append(4)
+        items.insert(0, 0)
+        items.move(0, -1)
+        self.assertEqual(items.pop(), 0)
+        items.set_item(0, 10)
+        items.remove(3)
+        self.assertEqual(items.get(), (10, 2, 4))
+
+    def test_keyword_arguments(self) -> None:
+        items = MutableListState(range(5))
+        self.assertEqual(items.splice(index=0, count=1), (0,))
+        self.assertEqual(items.splice(1, count=1, items=[9]), (2,))
+        self.assertEqual(items.pop(index=0), 1)
+        items.insert(index=0, item=7)
+        self.assertEqual(items.get(), (7, 9, 3, 4))
+
+    def test_records(self) -> None:
+        items = MutableListState([1, 2, 3])
+        records: list = []
+        items.subscribe_changes(records.extend)
+        items.set_item(1, 2)  # Equal: nothing to record
+        items.set_item(1, 5)
+        items.move(0, 2)
+        self.assertEqual(
+            records,
+            [ListSplice(0, (), (1, 2, 3)), ListSplice(1, (2,), (5,)), ListMove(0, 2)],
+        )
+
+    def test_dispatched_with_keyword_arguments(self) -> None:
+        queue: list = []
+        set_dispatcher(queue.append)
+        try:
+            items = MutableListState(range(3))
+            thread = threading.Thread(target=lambda: items.splice(index=0, count=1))
+            thread.start()
+            thread.join()
+            self.assertEqual(items.get(), (0, 1, 2))
+            for callback in queue:
+                callback()
+        finally:
+            set_dispatcher(None)
+        self.assertEqual(items.get(), (1, 2))
+        self.assertIsNone(_state._dispatch)
+
+
+class MutableDictStateTest(unittest.TestCase):
+    def test_keyword_arguments(self) -> None:
+        items = MutableDictState({"a": 1})
+        self.assertIsNone(items.pop("b", default=None))
+        self.assertEqual(items.pop(key="a"), 1)
+        self.assertRaises(KeyError, items.pop, "a")
+        items.set_item(key="c", value=3)
+        self.assertEqual(dict(items.get()), {"c": 3})
+
+    def test_records(self) -> None:
+        items = MutableDictState({"a": 1})
+        records: list = []
+        items.subscribe_changes(records.extend)
+        items.set({"a": 1, "b": 2})
+        items.pop("a")
+        self.assertEqual(
+            records,
+            [DictChange("a", MISSING, 1), DictChange("b", MISSING, 2), DictChange("a", 1, MISSING)],
+        )
+
+
+class ListViewTest(unittest.TestCase):
+    def test_views_follow_random_operations(self) -> None:
+        rng = random.Random(3)
+        source = MutableListState(rng.randrange(100) for _ in range(50))
+        mapped = source.mapped(lambda item: item * 2)
+        filtered = source.filtered(lambda item: item % 3 == 0)
+        ordered = source.sorted()
+        descending = filtered.sorted(reverse=True)
+        views = (mapped, filtered, ordered, descending)
+        for view in views:
+            view.subscribe(lambda _: None)
+        for _ in range(500):
+            operation = rng.randrange(5)
+            if operation == 0 or not source._items:
+                source.insert(rng.randint(0, len(source._items)), rng.randrange(100))
+            elif operation == 1:
+                source.pop(rng.randrange(len(source._items)))
+            elif operation == 2:
+                source.set_item(rng.randrange(len(source._items)), rng.randrange(100))
+            elif operation == 3:
+                last = len(source._items) - 1
+                source.move(rng.randint(0, last), rng.randint(0, last))
+            else:
+                index = rng.randint(0, len(source._items))
+                source.splice(index, rng.randrange(3), [rng.randrange(100) for _ in range(80)])
+            items = source.get()
+            self.assertEqual(mapped.get(), tuple(item * 2 for item in items))
+            self.assertEqual(filtered.get(), tuple(item for item in items if item % 3 == 0))
+            self.assertEqual(ordered.get(), tuple(sorted(items)))
+            self.assertEqual(descending.get(), tuple(sorted(filtered.get(), reverse=True)))
+
+    def test_records_replay_to_the_view(self) -> None:
+        source = MutableListState(range(10))
+        view = source.filtered(lambda item: item % 2 == 0).sorted(reverse=True)
+        items: list = []
+        view.subscribe_changes(lambda records: replay(records, items))
+        source.extend([12, 11, 14])
+        source.remove(4)
+        source.set_item(0, 7)
+        self.assertEqual(tuple(items), view.get())
+        self.assertEqual(view.get(), (14, 12, 8, 6, 2))
+
+    def test_detached_view_rebuilds_on_read(self) -> None:
+        source = MutableListState([3, 1, 2])
+        view = source.sorted()
+        source.append(0)
+        self.assertEqual(view.get(), (0, 1, 2, 3))
+
+
+class DictViewTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.source = MutableDictState({"a": 1, "b": 2, "c": 3, "d": 4})
+        self.mapped = self.source.mapped(lambda value: value * 10)
+        self.filtered = self.source.filtered(lambda _, value: value % 2 == 0)
+        for view in (self.mapped, self.filtered):
+            view.subscribe(lambda _: None)
+
+    def test_updates_keep_the_order_of_the_source(self) -> None:
+        self.source.set_item("a", 6)
+        self.assertEqual(
+            list(self.mapped.get().items()), [("a", 60), ("b", 20), ("c", 30), ("d", 40)]
+        )
+        self.assertEqual(list(self.filtered.get()), ["a", "b", "d"])
+        self.source.set_item("c", 8)
+        self.assertEqual(list(self.filtered.get()), ["a", "b", "c", "d"])
+        self.source.set_item("b", 5)
+        self.assertEqual(list(self.filtered.get()), ["a", "c", "d"])
+
+    def test_added_keys_come_last(self) -> None:
+        self.source.pop("b")
+        self.source.set_item("b", 2)
+        self.assertEqual(list(self.mapped.get()), ["a", "c", "d", "b"])
+        self.assertEqual(list(self.filtered.get()), ["d", "b"])
+
+    def test_records(self) -> None:
+        records: list = []
+        self.filtered.subscribe_changes(records.extend)
+        self.source.set_item("a", 6)
+        self.source.set_item("d", 5)
+        self.assertEqual(
+            records,
+            [
+                DictChange("b", MISSING, 2),
+                DictChange("d", MISSING, 4),
+                DictChange("a", MISSING, 6),
+                DictChange("d", 4, MISSING),
+            ],
+        )
+
+    def test_sorted_values(self) -> None:
+        rows = self.source.sorted(reverse=True)
+        rows.subscribe(lambda _: None)
+        self.source.update({"a": 7, "e": 0})
+        self.assertEqual(rows.get(), (7, 4, 3, 2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
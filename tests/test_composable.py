@@ -0,0 +1,126 @@
+import unittest
+from typing import Any
+
+from compy.composable import Column, Composable, Text, composes, memo
+from compy.headless import operations
+from compy.state import MutableState, State, batch, derived
+from compy.widget import TextWidget
+from compy.widget_factory import widget_factory
+
+
+def setUpModule() -> None:
+    widget_factory.use_backend("headless")
+
+
+class PropsTest(unittest.TestCase):
+    def test_binds_parameters_accepting_a_state(self) -> None:
+        text = MutableState("a")
+        node = Text(text).compose()
+        self.assertEqual(node.props["text"], "a")
+        text.set("b")
+        self.assertEqual(node.props["text"], "b")
+
+    def test_skips_parameters_annotated_without_state(self) -> None:
+        @composes(TextWidget)
+        def Label(text: str, value: int = 0) -> dict[str, Any]:
+            return locals()
+
+        text = MutableState("a")
+        Label(text).compose()
+        self.assertEqual(text.observers, [])
+
+    def test_binds_props_outside_the_parameters(self) -> None:
+        text = MutableState("a")
+
+        @composes(TextWidget)
+        def Label(value: int) -> dict[str, Any]:
+            return {"text": text}
+
+        node = Label(1).compose()
+        self.assertEqual(node.props["text"], "a")
+        text.set("b")
+        self.assertEqual(node.props["text"], "b")
+
+    def test_binds_every_prop_without_a_known_signature(self) -> None:
+        @composes(TextWidget)
+        def Label(**props: Any) -> dict[str, Any]:
+            return props
+
+        text: State[str] = MutableState("a")
+        node = Label(text=text).compose()
+        self.assertEqual(node.props["text"], "a")
+
+    def test_updates_once_per_change_of_a_diamond(self) -> None:
+        a = MutableState(1)
+        b = derived(lambda: a.get() + 1, a)
+        c = derived(lambda: a.get() * 2, a)
+        text = derived(lambda: f"{b.get()} {c.get()}", b, c)
+        node = Text(text).compose()
+        operations.reset()
+        with batch():
+            a.set(2)
+            a.set(3)
+        self.assertEqual(node.props["text"], "4 6")
+        self.assertEqual(operations["update"], 1)
+
+
+class MemoTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls: list[str] = []
+
+        @memo
+        def Card(title: str) -> Composable:
+            self.calls.append(title)
+            return Column()(Text(title))
+
+        self.Card = Card
+        self.titles = MutableState(["a", "b", "c"])
+        self.other = MutableState(0)
+        self.returned: list[list[Composable]] = []
+
+    def content(self, keyed: bool) -> list[Composable]:
+        self.other.get()
+        if keyed:
+            cards = [self.Card(title, key=title) for title in self.titles.get()]
+        else:
+            cards = [self.Card(title) for title in self.titles.get()]
+        self.returned.append(cards)
+        return cards
+
+    def test_reuses_the_composable_for_equal_arguments(self) -> None:
+        Column(content=lambda: self.content(keyed=False)).compose()
+        operations.reset()
+        self.other.set(1)
+        self.assertEqual(len(self.returned), 2)
+        for before, after in zip(*self.returned):
+            self.assertIs(before, after)
+        self.assertEqual(self.calls, ["a", "b", "c"])
+        self.assertEqual(operations["create"], 0)
+
+    def test_calls_again_for_other_arguments(self) -> None:
+        Column(content=lambda: self.content(keyed=False)).compose()
+        self.titles.set(["a", "x", "c"])
+        self.assertEqual(self.calls, ["a", "b", "c", "x"])
+
+    def test_keyed_moves(self) -> None:
+        root = Column(content=lambda: self.content(keyed=True)).compose()
+        nodes = list(root.children)
+        operations.reset()
+        self.titles.set(["c", "a", "b"])
+        self.assertEqual(self.calls, ["a", "b", "c"])
+        self.assertEqual(root.children, [nodes[2], nodes[0], nodes[1]])
+        self.assertEqual(operations["create"], 0)
+        self.assertEqual(operations["update"], 0)
+        self.assertEqual(self.returned[-1][0].key, "c")
+
+    def test_forwards_the_key_to_components_taking_one(self) -> None:
+        @memo
+        def Item(title: str, key: Any = None) -> Composable:
+            return Text(f"{title} {key}", key=key)
+
+        root = Column(content=lambda: [Item("a", key=1), Item("b")]).compose()
+        self.assertEqual([child.props["text"] for child in root.children], ["a 1", "b None"])
+
+
+if __name__ == "__main__":
+    unittest.main()
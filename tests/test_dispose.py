@@ -0,0 +1,64 @@
+import gc
+import tracemalloc
+import unittest
+
+from compy.composable import Button, Column, LazyColumn, Row, Text
+from compy.state import MutableState, auto_derived
+from compy.widget_factory import widget_factory
+
+CYCLES = 10_000
+
+
+def setUpModule() -> None:
+    widget_factory.use_backend("headless")
+
+
+class DisposeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.count = MutableState(0)
+        self.items = MutableState(list(range(50)))
+
+    def mount(self) -> None:
+        """Compose a small tree bound to the states, update it and unmount it."""
+        count = self.count
+        label = auto_derived(lambda: f"Count: {count.get()}")
+        root = Column()(
+            Row()(Button(onclick=lambda: count.set(count.get() + 1))(Text("+")), Text(label)),
+            Text(auto_derived(lambda: str(count.get()))),
+            LazyColumn(self.items, lambda value: Text(str(value))),
+        )
+        root.compose()
+        count.set(count.get() + 1)
+        root.dispose()
+
+    def test_releases_observers_and_dependents(self) -> None:
+        self.mount()
+        self.assertEqual(self.count.observers, [])
+        self.assertEqual(self.count._dependents, {})
+        self.assertEqual(self.items.observers, [])
+        self.assertEqual(self.items._dependents, {})
+
+    def test_memory_stays_flat(self) -> None:
+        for _ in range(1_000):  # Warm up caches and interned values
+            self.mount()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for _ in range(CYCLES):
+                self.mount()
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        # A leak of a single node per cycle would grow by more than 1 MB.
+        self.assertLess(growth, 64 * 1024)
+        self.assertEqual(self.count.observers, [])
+        self.assertEqual(self.count._dependents, {})
+        self.assertEqual(self.items.observers, [])
+        self.assertEqual(self.items._dependents, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+from typing import Any
+
+from compy.composable import Column, Text, composes
+from compy.equality import identity, never_equal, structural, versioned
+from compy.headless import operations
+from compy.state import MutableState, State
+from compy.widget import TextWidget
+from compy.widget_factory import widget_factory
+
+
+def setUpModule() -> None:
+    widget_factory.use_backend("headless")
+
+
+class Elementwise:
+    """Result of comparing arrays: truthiness is ambiguous, like NumPy's."""
+
+    def __init__(self, results: list[bool]) -> None:
+        self.results = results
+
+    def all(self) -> bool:
+        return all(self.results)
+
+    def __bool__(self) -> bool:
+        raise ValueError("The truth value of an array is ambiguous")
+
+
+class FakeArray:
+    """Minimal array comparing elementwise, without NumPy."""
+
+    def __init__(self, *values: Any) -> None:
+        self.values = values
+        self.shape = (len(values),)
+        self.comparisons = 0
+
+    def __eq__(self, other: object) -> Any:  # type: ignore[override]
+        self.comparisons += 1
+        if not isinstance(other, FakeArray):
+            return False
+        if other.shape != self.shape:
+            raise ValueError("operands could not be broadcast together")
+        return Elementwise([a == b for a, b in zip(self.values, other.values)])
+
+
+class Versioned:
+    def __init__(self, version: int, data: Any) -> None:
+        self.version = version
+        self.data = data
+
+
+class PoliciesTest(unittest.TestCase):
+    def test_structural(self) -> None:
+        self.assertTrue(structural([1, 2], [1, 2]))
+        self.assertFalse(structural([1, 2], [1, 3]))
+
+    def test_structural_arrays(self) -> None:
+        self.assertTrue(structural(FakeArray(1, 2), FakeArray(1, 2)))
+        self.assertFalse(structural(FakeArray(1, 2), FakeArray(1, 3)))
+        self.assertFalse(structural(FakeArray(1, 2), FakeArray(1, 2, 3)))
+        array = FakeArray(1, 2)
+        self.assertTrue(structural(array, array))
+        self.assertEqual(array.comparisons, 0)  # Identical objects are not compared
+
+    def test_identity_and_never_equal(self) -> None:
+        value = [1]
+        self.assertTrue(identity(value, value))
+        self.assertFalse(identity(value, [1]))
+        self.assertFalse(never_equal(value, value))
+
+    def test_versioned(self) -> None:
+        equal = versioned()
+        self.assertTrue(equal(Versioned(1, "a"), Versioned(1, "b")))
+        self.assertFalse(equal(Versioned(1, "a"), Versioned(2, "a")))
+        by_revision = versioned(lambda value: value["revision"])
+        self.assertTrue(by_revision({"revision": 3, "rows": 1}, {"revision": 3, "rows": 2}))
+
+    def test_state_of_arrays(self) -> None:
+        values = MutableState(FakeArray(1, 2))
+        seen: list = []
+        values.subscribe(seen.append)
+        seen.clear()
+        values.set(FakeArray(1, 2))
+        self.assertEqual(seen, [])
+        values.set(FakeArray(1, 3))
+        self.assertEqual(len(seen), 1)
+
+
+class PropPoliciesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tick = MutableState(0)
+
+    def recompose_count(self, component: Any, make_value: Any) -> int:
+        """Updates applied when the content re-creates `component(make_value())`."""
+
+        def content() -> list:
+            self.tick.get()
+            return [component(make_value())]
+
+        Column(content=content).compose()
+        operations.reset()
+        self.tick.set(1)
+        return operations["update"]
+
+    def test_props_compare_structurally(self) -> None:
+        @composes(TextWidget)
+        def Label(text: Any) -> dict[str, Any]:
+            return locals()
+
+        self.assertEqual(self.recompose_count(Label, lambda: [1, 2]), 0)
+        self.assertEqual(self.recompose_count(Label, lambda: FakeArray(1, 2)), 0)
+
+    def test_per_prop_policy(self) -> None:
+        @composes(TextWidget, equal={"text": identity})
+        def Label(text: Any) -> dict[str, Any]:
+            return locals()
+
+        self.assertEqual(self.recompose_count(Label, lambda: [1, 2]), 1)
+        shared = [1, 2]
+        self.assertEqual(self.recompose_count(Label, lambda: shared), 0)
+
+    def test_bound_prop_uses_the_policy_of_its_state(self) -> None:
+        text: State[Any] = MutableState([1], equal=identity)
+        node = Text(text).compose()
+        operations.reset()
+        text.set([1])
+        self.assertEqual(operations["update"], 1)
+        self.assertEqual(node.props["text"], [1])
+
+    def test_per_prop_policy_overrides_the_state(self) -> None:
+        @composes(TextWidget, equal={"text": structural})
+        def Label(text: Any) -> dict[str, Any]:
+            return locals()
+
+        text: State[Any] = MutableState([1], equal=never_equal)
+        Label(text).compose()
+        operations.reset()
+        text.set([1])
+        self.assertEqual(operations["update"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+
+from compy.collections import MutableDictState, MutableListState
+from compy.persist import PersistentStore
+from compy.state import MutableState, auto_derived, derived
+
+
+class Counted:
+    """A computation counting its calls."""
+
+    def __init__(self, compute) -> None:
+        self.compute = compute
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.compute()
+
+
+class PersistentStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "state", "snapshot.bin")
+
+    def save(self, schema: int = 1, **states) -> PersistentStore:
+        store = PersistentStore(self.path, schema=schema)
+        for key, state in states.items():
+            store.register(key, state)
+        self.assertTrue(store.save())
+        return store
+
+    def derived_pair(self, value: int):
+        """A persistent input and a lazy derived state computed from it."""
+        count = MutableState(value)
+        compute = Counted(lambda: count.get() * 10)
+        return count, derived(compute, count, lazy=True), compute
+
+    def test_round_trip(self) -> None:
+        self.save(
+            count=MutableState(3),
+            rows=MutableListState([1, 2]),
+            names=MutableDictState({"a": "x"}),
+        )
+        store = PersistentStore(self.path)
+        count, rows, names = MutableState(0), MutableListState(), MutableDictState()
+        store.register("count", count)
+        self.assertTrue(store.restore())
+        store.register("rows", rows)  # Registered after restoring
+        store.register("names", names)
+        self.assertEqual(count.get(), 3)
+        self.assertEqual(rows.get(), (1, 2))
+        self.assertEqual(dict(names.get()), {"a": "x"})
+
+    def test_restores_a_derived_value_without_recomputing(self) -> None:
+        count, total, _ = self.derived_pair(2)
+        self.assertEqual(total.get(), 20)
+        self.save(count=count, total=total)
+
+        count, total, compute = self.derived_pair(0)
+        store = PersistentStore(self.path)
+        self.assertTrue(store.restore())
+        store.register("count", count)
+        store.register("total", total)
+        self.assertEqual(total.get(), 20)
+        self.assertEqual(compute.calls, 0)
+        count.set(3)
+        self.assertEqual(total.get(), 30)
+        self.assertEqual(compute.calls, 1)
+
+    def test_restores_a_tracked_derived_value(self) -> None:
+        count = MutableState(2)
+        total = auto_derived(lambda: count.get() + 1, lazy=True)
+        total.get()
+        self.save(count=count, total=total)
+
+        count = MutableState(0)
+        compute = Counted(lambda: count.get() + 1)
+        total = auto_derived(compute, lazy=True)
+        store = PersistentStore(self.path)
+        store.restore()
+        store.register("count", count)
+        store.register("total", total)
+        self.assertEqual(total.get(), 3)
+        self.assertEqual(compute.calls, 0)
+
+    def test_recomputes_when_a_dependency_changed_before_restore(self) -> None:
+        count, total, _ = self.derived_pair(2)
+        total.get()
+        self.save(count=count, total=total)
+
+        count, total, compute = self.derived_pair(0)
+        store = PersistentStore(self.path)
+        store.restore()
+        store.register("count", count)
+        count.set(5)
+        store.register("total", total)
+        self.assertEqual(total.get(), 50)
+        self.assertEqual(compute.calls, 1)
+
+    def test_recomputes_when_a_dependency_is_not_persistent(self) -> None:
+        count, offset = MutableState(2), MutableState(1)
+        total = derived(lambda: count.get() + offset.get(), count, offset, lazy=True)
+        total.get()
+        self.save(count=count, total=total)
+
+        count, offset = MutableState(0), MutableState(7)
+        compute = Counted(lambda: count.get() + offset.get())
+        total = derived(compute, count, offset, lazy=True)
+        store = PersistentStore(self.path)
+        store.restore()
+        store.register("count", count)
+        store.register("total", total)
+        self.assertEqual(total.get(), 9)
+        self.assertEqual(compute.calls, 1)
+
+    def test_ignores_another_schema_without_migrate(self) -> None:
+        self.save(count=MutableState(3))
+        count = MutableState(0)
+        store = PersistentStore(self.path, schema=2)
+        store.register("count", count)
+        self.assertFalse(store.restore())
+        self.assertEqual(count.get(), 0)
+
+    def test_migrates_another_schema(self) -> None:
+        count, total, _ = self.derived_pair(3)
+        total.get()
+        self.save(count=count, total=total)
+
+        def migrate(schema: int, values: dict) -> dict:
+            self.assertEqual(schema, 1)
+            return {"count": values["count"] + 1}
+
+        count, total, compute = self.derived_pair(0)
+        store = PersistentStore(self.path, schema=2, migrate=migrate)
+        store.register("count", count)
+        store.register("total", total)
+        self.assertTrue(store.restore())
+        self.assertEqual(count.get(), 4)
+        self.assertEqual(total.get(), 40)  # Derived values are recomputed after a migration
+        self.assertEqual(compute.calls, 1)
+
+    def test_unreadable_files(self) -> None:
+        count = MutableState(0)
+        store = PersistentStore(self.path)
+        store.register("count", count)
+        self.assertFalse(store.restore())  # Missing
+
+        self.save(count=MutableState(3))
+        with open(self.path, "rb") as file:
+            data = file.read()
+        for broken in (data[:5], data[:-4], data[:12] + b"\0" * (len(data) - 12), b"x" * 64):
+            with open(self.path, "wb") as file:
+                file.write(broken)
+            self.assertFalse(store.restore(), broken)
+        self.assertEqual(count.get(), 0)
+
+    def test_registering_a_key_twice(self) -> None:
+        store = PersistentStore(self.path)
+        store.register("count", MutableState(0))
+        with self.assertRaises(ValueError):
+            store.register("count", MutableState(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
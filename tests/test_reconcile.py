@@ -0,0 +1,103 @@
+import random
+import unittest
+
+from compy.composable import Button, Column, Text
+from compy.headless import operations
+from compy.state import MutableState, auto_derived
+from compy.widget_factory import widget_factory
+
+
+def setUpModule() -> None:
+    widget_factory.use_backend("headless")
+
+
+class ReconcileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = MutableState(list(range(10)))
+        items = self.items
+        self.root = Column(content=lambda: [Text(str(i), key=i) for i in items.get()]).compose()
+        operations.reset()
+
+    def texts(self) -> list[str]:
+        return [child.props["text"] for child in self.root.children]
+
+    def test_keyed_children_keep_their_nodes(self) -> None:
+        nodes = {child.props["text"]: child for child in self.root.children}
+        self.items.set([9, 3, 0, 1, 2, 4, 5, 6, 7, 8])
+        self.assertEqual(self.texts(), ["9", "3", "0", "1", "2", "4", "5", "6", "7", "8"])
+        for child in self.root.children:
+            self.assertIs(child, nodes[child.props["text"]])
+        self.assertEqual(operations["create"], 0)
+        self.assertEqual(operations["update"], 0)
+
+    def test_moves_only_children_out_of_order(self) -> None:
+        self.items.set([9, 0, 1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(operations["content"], 1)
+
+    def test_inserts_and_removes(self) -> None:
+        self.items.set([0, 1, 20, 2, 3, 5, 6, 7, 8, 9, 21])
+        self.assertEqual(self.texts(), ["0", "1", "20", "2", "3", "5", "6", "7", "8", "9", "21"])
+        self.assertEqual(operations["create"], 2)
+        self.assertEqual(operations["content"], 3)  # Two insertions and one removal
+
+    def test_random_permutations(self) -> None:
+        rng = random.Random(7)
+        for _ in range(200):
+            items = rng.sample(range(15), rng.randint(0, 15))
+            self.items.set(items)
+            self.assertEqual(self.texts(), [str(i) for i in items])
+
+    def test_unkeyed_children_match_by_position(self) -> None:
+        labels = MutableState(["a", "b"])
+        root = Column(content=lambda: [Text(label) for label in labels.get()]).compose()
+        first, second = root.children
+        operations.reset()
+        labels.set(["c", "b", "d"])
+        self.assertIs(root.children[0], first)
+        self.assertIs(root.children[1], second)
+        self.assertEqual([child.props["text"] for child in root.children], ["c", "b", "d"])
+        self.assertEqual(operations["create"], 1)
+        self.assertEqual(operations["update"], 2)  # "a" to "c", and the new node
+
+    def test_replaces_children_of_another_type(self) -> None:
+        button = MutableState(False)
+
+        def content() -> list:
+            if button.get():
+                return [Button(onclick=lambda: None, key="x")(Text("x"))]
+            return [Text("x", key="x")]
+
+        root = Column(content=content).compose()
+        text = root.children[0]
+        button.set(True)
+        self.assertIsNot(root.children[0], text)
+        self.assertEqual(root.children[0].kind, "button")
+
+    def test_disposes_removed_children(self) -> None:
+        count = MutableState(0)
+        shown = MutableState(True)
+        label = auto_derived(lambda: str(count.get()))
+        Column(content=lambda: [Text(label, key="label")] if shown.get() else []).compose()
+        self.assertEqual(len(label.observers), 1)
+        shown.set(False)
+        self.assertEqual(label.observers, [])
+        self.assertEqual(count._dependents, {})
+
+    def test_releases_content_failing_on_first_compose(self) -> None:
+        count = MutableState(0)
+
+        def content() -> list:
+            if count.get() == 0:
+                raise RuntimeError("not ready")
+            return [Text(str(count.get()))]
+
+        with self.assertRaises(RuntimeError):
+            Column(content=content).compose()
+        self.assertEqual(count._dependents, {})
+        count.set(1)  # No longer re-evaluates the failed content
+        root = Column(content=content).compose()
+        self.assertEqual(root.children[0].props["text"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import threading
+import unittest
+
+from compy import state as _state
+from compy.state import MutableState, auto_derived, batch, derived, set_dispatcher
+
+
+class Counted:
+    """A computation counting its calls."""
+
+    def __init__(self, compute) -> None:
+        self.compute = compute
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.compute()
+
+
+class PropagationTest(unittest.TestCase):
+    def test_diamond_recomputes_once_without_glitches(self) -> None:
+        a = MutableState(1)
+        b = derived(lambda: a.get() + 1, a)
+        c = derived(lambda: a.get() * 2, a)
+        compute = Counted(lambda: (b.get(), c.get()))
+        d = derived(compute, b, c)
+        seen: list = []
+        d.subscribe(seen.append)
+        self.assertEqual((compute.calls, seen), (1, [(2, 2)]))
+        a.set(2)
+        self.assertEqual(compute.calls, 2)
+        self.assertEqual(seen, [(2, 2), (3, 4)])
+
+    def test_batch_notifies_each_observer_once(self) -> None:
+        a, b = MutableState(0), MutableState(0)
+        compute = Counted(lambda: a.get() + b.get())
+        total = derived(compute, a, b)
+        seen: list = []
+        a.subscribe(lambda value: seen.append(("a", value)))
+        total.subscribe(lambda value: seen.append(("total", value)))
+        seen.clear()
+        with batch():
+            a.set(1)
+            a.set(2)
+            b.set(3)
+            self.assertEqual(seen, [])
+        self.assertEqual(sorted(seen), [("a", 2), ("total", 5)])
+        self.assertEqual(compute.calls, 2)
+
+    def test_batch_as_a_decorator(self) -> None:
+        a, b = MutableState(0), MutableState(0)
+        seen: list = []
+        derived(lambda: (a.get(), b.get()), a, b).subscribe(seen.append)
+        seen.clear()
+
+        @batch()
+        def update() -> None:
+            a.set(1)
+            b.set(2)
+
+        update()
+        self.assertEqual(seen, [(1, 2)])
+
+    def test_nested_batches_flush_at_the_outermost(self) -> None:
+        a = MutableState(0)
+        seen: list = []
+        a.subscribe(seen.append)
+        seen.clear()
+        with batch():
+            with batch():
+                a.set(1)
+            self.assertEqual(seen, [])
+            a.set(2)
+        self.assertEqual(seen, [2])
+
+    def test_reranks_when_tracking_reads_a_deeper_state(self) -> None:
+        a = MutableState(0)
+        deep = MutableState(False)
+        d1 = derived(lambda: a.get() + 1, a)
+        d2 = derived(lambda: d1.get() + 1, d1)
+        d3 = derived(lambda: d2.get() + 1, d2)
+        compute = Counted(lambda: d3.get() if deep.get() else -a.get())
+        x = auto_derived(compute)
+        seen: list = []
+        x.subscribe(seen.append)
+        self.assertLess(x._height, d3._height)
+        with batch():
+            deep.set(True)
+            a.set(5)
+        self.assertGreater(x._height, d3._height)
+        self.assertEqual(seen, [0, 8])
+        calls = compute.calls
+        a.set(6)
+        self.assertEqual(compute.calls, calls + 1)
+        self.assertEqual(seen, [0, 8, 9])
+
+
+class ThreadSafeSetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatched: list = []
+        set_dispatcher(self.dispatched.append)
+        self.count = MutableState(0)
+        self.calls: list[int] = []
+        self.count.subscribe(self.calls.append)
+        self.calls.clear()
+
+    def tearDown(self) -> None:
+        set_dispatcher(None)
+
+    def in_thread(self, func) -> None:
+        thread = threading.Thread(target=func)
+        thread.start()
+        thread.join()
+
+    def test_collapses_writes_into_one_dispatched_flush(self) -> None:
+        def write() -> None:
+            for value in range(1, 101):
+                self.count.set(value)
+
+        self.in_thread(write)
+        self.assertEqual(len(self.dispatched), 1)
+        self.assertEqual(self.count.get(), 0)
+        self.assertEqual(self.calls, [])
+        self.dispatched.pop()()
+        self.assertEqual(self.count.get(), 100)
+        self.assertEqual(self.calls, [100])
+
+    def test_applies_writes_to_several_states_in_one_batch(self) -> None:
+        other = MutableState("a")
+        seen: list = []
+        other.subscribe(lambda value: seen.append((self.count.get(), value)))
+        seen.clear()
+        self.in_thread(lambda: (self.count.set(1), other.set("b")))
+        self.assertEqual(len(self.dispatched), 1)
+        self.dispatched.pop()()
+        self.assertEqual(seen, [(1, "b")])
+
+    def test_writes_on_the_main_thread_directly(self) -> None:
+        self.count.set(5)
+        self.assertEqual(self.dispatched, [])
+        self.assertEqual(self.calls, [5])
+
+    def test_without_a_dispatcher_writes_directly(self) -> None:
+        set_dispatcher(None)
+        self.assertIsNone(_state._dispatch)
+        self.in_thread(lambda: self.count.set(3))
+        self.assertEqual(self.dispatched, [])
+        self.assertEqual(self.count.get(), 3)
+        self.assertEqual(self.calls, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from compy.state import MutableState, set_dispatcher
+from compy.worker import process_derived, run_in_thread
+
+
+class Dispatcher:
+    """Queues callbacks from any thread, run by the test on the main thread."""
+
+    def __init__(self) -> None:
+        self.callbacks: list = []
+        self.lock = threading.Lock()
+
+    def __call__(self, callback) -> None:
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def run(self) -> int:
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+        return len(callbacks)
+
+
+class RunInThreadTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatcher = Dispatcher()
+        set_dispatcher(self.dispatcher)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.result = MutableState(0)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        set_dispatcher(None)
+
+    def test_publishes_the_result_on_the_main_thread(self) -> None:
+        threads: list[int] = []
+        self.result.subscribe(lambda _: threads.append(threading.get_ident()))
+        threads.clear()
+        started = threading.Event()
+        future = run_in_thread(
+            self.result, lambda: started.wait(5) and 1024, executor=self.executor
+        )
+        started.set()  # Finish after the result callback is added, on the worker
+        self.assertEqual(future.result(5), 1024)
+        self.executor.shutdown()  # Wait for the done callback
+        self.assertEqual(self.result.get(), 0)
+        self.assertEqual(self.dispatcher.run(), 1)
+        self.assertEqual(self.result.get(), 1024)
+        self.assertEqual(threads, [threading.get_ident()])
+
+    def test_leaves_errors_on_the_future(self) -> None:
+        future = run_in_thread(self.result, int, "x", executor=self.executor)
+        self.assertIsInstance(future.exception(5), ValueError)
+        self.executor.shutdown()
+        self.assertEqual(self.dispatcher.run(), 0)
+        self.assertEqual(self.result.get(), 0)
+
+
+class ProcessDerivedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatcher = Dispatcher()
+        set_dispatcher(self.dispatcher)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.gates: dict[int, threading.Event] = {}
+        self.input = MutableState(1)
+
+    def tearDown(self) -> None:
+        for gate in self.gates.values():
+            gate.set()
+        self.executor.shutdown()
+        set_dispatcher(None)
+
+    def compute(self, value: int) -> int:
+        self.gates.setdefault(value, threading.Event()).wait(5)
+        if value < 0:
+            raise ValueError(value)
+        return value * 10
+
+    def finish(self, value: int) -> None:
+        """Let the run for `value` return, and wait until its result is queued."""
+        self.gates.setdefault(value, threading.Event()).set()
+        for _ in range(500):
+            if self.dispatcher.callbacks:
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"The run for {value} was not published")
+
+    def test_publishes_on_the_main_thread_in_one_batch(self) -> None:
+        derived = process_derived(self.compute, self.input, executor=self.executor)
+        calls: list = []
+        derived.status.subscribe(lambda status: calls.append((status, derived.value.get())))
+        derived.value.subscribe(lambda _: calls.append(threading.get_ident()))
+        calls.clear()
+        self.finish(1)
+        self.assertEqual(calls, [])
+        self.dispatcher.run()
+        self.assertEqual(calls, [threading.get_ident(), ("ready", 10)])
+        derived.dispose()
+
+    def test_drops_a_result_superseded_before_it_is_applied(self) -> None:
+        derived = process_derived(self.compute, self.input, executor=self.executor)
+        self.finish(1)  # Queued, but not applied yet
+        self.input.set(2)
+        self.dispatcher.run()
+        self.assertEqual(derived.status.get(), "loading")
+        self.assertIsNone(derived.value.get())
+        self.finish(2)
+        self.dispatcher.run()
+        self.assertEqual(derived.status.get(), "ready")
+        self.assertEqual(derived.value.get(), 20)
+        derived.dispose()
+
+    def test_publishes_errors(self) -> None:
+        self.input.set(-1)
+        derived = process_derived(self.compute, self.input, executor=self.executor)
+        self.finish(-1)
+        self.dispatcher.run()
+        self.assertEqual(derived.status.get(), "error")
+        self.assertIsInstance(derived.error.get(), ValueError)
+        derived.dispose()
+
+    def test_drops_results_after_dispose(self) -> None:
+        derived = process_derived(self.compute, self.input, executor=self.executor)
+        derived.dispose()
+        self.finish(1)
+        self.dispatcher.run()
+        self.assertEqual(derived.status.get(), "loading")
+
+    def test_requires_a_dispatcher(self) -> None:
+        set_dispatcher(None)
+        with self.assertRaises(RuntimeError):
+            process_derived(self.compute, self.input, executor=self.executor)
+
+
+if __name__ == "__main__":
+    unittest.main()